@@ -12,20 +12,33 @@ Usage:
   python3 agent.py --date 2026-02-15  # target a specific date
   python3 agent.py --cities CHI NYC MIA  # specific cities only
   python3 agent.py --history    # show trade history
+  python3 agent.py --quiet      # hide per-tool call/result lines
+  python3 agent.py --cached     # dry run only: reuse a Worker bundle from a run <30s ago
 """
 
+import io
 import os
 import sys
 import json
-import time
+import atexit
+import logging
 import argparse
 import datetime
 import re
+import math
+import string
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from itertools import islice
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util import Retry
+from urllib3.util.request import ACCEPT_ENCODING
 from dotenv import load_dotenv
 import anthropic
-from scipy.stats import norm
+import numpy as np
+from scipy.special import ndtr
 
 from config import (
     CST,
@@ -34,31 +47,98 @@ from config import (
     MAX_AGENT_TURNS,
     MAX_RUN_DOLLARS,
     CLAUDE_MODEL,
-    CITY_CONFIGS,
+    CITY_CODES,
+    CITY_CODES_TUPLE,
     WORKER_URL,
 )
 
+from tools.ev import contract_ev
+from tools.tool_cache import cache_get, cache_set
 from tools.kalshi_auth import load_private_key
 from tools.kalshi_trading import (
     tool_get_account_balance,
     tool_place_order,
     TRADING_TOOL_DEFINITIONS,
+    MIN_PRICE_CENTS,
+    MAX_PRICE_CENTS,
+)
+from tools.trade_log import (
+    log_trade_async, flush_trade_log, log_run, print_history, get_trade_history,
+    get_existing_tickers, get_city_bet_count,
 )
-from tools.trade_log import log_trade, log_run, print_history, get_trade_history, get_existing_tickers, get_city_bet_count
 from tools.notify import notify_bets_placed, notify_error
 
+log = logging.getLogger("agent")
+# Flush each streamed text delta only when someone is watching; under cron or
+# a pipe, stdout stays block-buffered instead of one write() per delta
+_LIVE_OUTPUT = sys.stdout.isatty()
+
 # Tracks cumulative dollars committed in this run (reset each run)
 _run_spend_cents = 0
-# Valid Kalshi ticker: uppercase letters, digits, hyphens, dots
-_TICKER_RE = re.compile(r"^[A-Z0-9][A-Z0-9\-\.]{2,60}$")
+_MAX_RUN_CENTS = int(round(MAX_RUN_DOLLARS * 100))
+_RUN_CAP_ERROR = (
+    "RUN SPENDING CAP: This order costs {cost}c but only {remaining}c remains of the "
+    f"${MAX_RUN_DOLLARS:.0f} per-run limit. Already committed ${{spent:.2f}} this run."
+)
+# +1 / -1 so cost per contract is 50 + sign * (yes_price - 50) for either side
+_SIDE_SIGN = {"yes": 1, "no": -1}
+# Valid Kalshi ticker: 3-61 chars of uppercase letters, digits, hyphens, dots,
+# starting with a letter or digit. Checked with str.translate (deletes every
+# allowed char; anything left over is invalid) instead of a regex.
+_TICKER_ALNUM = string.ascii_uppercase + string.digits
+_TICKER_STRIP = str.maketrans("", "", _TICKER_ALNUM + "-.")
+# Single-pass city-code scan (longest codes first so they win at the same offset)
+_CITY_RE = re.compile("|".join(map(re.escape, sorted(CITY_CODES, key=len, reverse=True))))
+# Tools with no side effects -- safe to run concurrently within a turn
+_READ_ONLY_TOOLS = frozenset({"get_account_balance"})
 # Max bets per city per day (hard limit Claude can't override)
 MAX_BETS_PER_CITY = 2
+# Max wait for the end-of-run Discord post
+NOTIFY_TIMEOUT_SECS = 10
+# Shared by every main() call in the process, so it is never shut down
+_NOTIFY_POOL = ThreadPoolExecutor(max_workers=1)
 # Tracks bets placed this run per city
 _run_city_bets = {}
+# Trade-log snapshot for the dedup/city-limit guardrails, read once per target
+# date on the first order of a run: target_date -> ({(ticker, side)}, {city: count}).
+# Orders placed this run are added in memory instead of re-querying; run_agent
+# clears it so every run starts from the log.
+_logged_positions = {}
+
+
+@lru_cache(maxsize=512)
+def _valid_ticker(ticker):
+    return (3 <= len(ticker) <= 61 and ticker[0] in _TICKER_ALNUM
+            and not ticker.translate(_TICKER_STRIP))
+
+
+@lru_cache(maxsize=512)
+def _city_from_ticker(ticker):
+    """City code of a ticker, or "" if no configured city appears in it."""
+    # Well-formed contract tickers carry the city right after HIGH/LOWT
+    parsed = _parse_ticker(ticker)
+    if parsed and parsed[1] in CITY_CODES:
+        return parsed[1]
+    m = _CITY_RE.search(ticker)
+    return m.group(0) if m else ""
+
 
 # Ticker parsing regex (same as settle.py)
 _CONTRACT_RE = re.compile(r"KX(HIGH|LOWT)([A-Z]+)-\d+[A-Z]+\d+-([BT])([\d\.]+)")
 
+
+@lru_cache(maxsize=512)
+def _parse_ticker(ticker):
+    """(temp_type, city, bet_type, value) from a contract ticker, or None.
+
+    Memoized: the same tickers are parsed for the probability model and again
+    by the place_order guardrails.
+    """
+    m = _CONTRACT_RE.search(ticker)
+    if not m:
+        return None
+    return m.group(1), m.group(2), m.group(3), float(m.group(4))
+
 # ---------------------------------------------------------------------------
 # NWS Forecast Error Model
 # ---------------------------------------------------------------------------
@@ -77,6 +157,10 @@ FORECAST_ERROR_SD = {
     "PHIL": {"winter": 6.0, "spring": 5.0, "summer": 3.5, "autumn": 5.0},
 }
 _DEFAULT_SD = {"winter": 6.0, "spring": 5.0, "summer": 3.5, "autumn": 5.0}
+# Same tables flattened to (city, season) -> SD, so the model does one lookup per contract
+_SD_BY_CITY_SEASON = {
+    (city, season): sd for city, table in FORECAST_ERROR_SD.items() for season, sd in table.items()
+}
 
 
 def _get_season(date_str):
@@ -91,52 +175,41 @@ def _get_season(date_str):
         return "autumn"
 
 
-def _contract_prob(ticker, forecast_high, forecast_low, yes_sub_title=""):
-    """Compute P(YES wins) for a contract given NWS forecast temps.
+def _contract_z_bounds(ticker, forecast_high, forecast_low, yes_sub_title=""):
+    """Standardized bounds (z_upper, z_lower) of the temperature range where YES wins,
+    so P(YES) = ndtr(z_upper) - ndtr(z_lower). Open ends are +/-inf.
 
-    Args:
-        ticker: Kalshi contract ticker
-        forecast_high: NWS predicted high temp (F)
-        forecast_low: NWS predicted low temp (F)
-        yes_sub_title: contract's yes_sub_title (e.g. "56° or above", "47° or below")
-            Used to determine threshold direction for T contracts.
-
-    Returns (probability, city_code) or (None, None) if ticker can't be parsed.
+    Returns (z_upper, z_lower, city_code), or (None, None, city_code) if there's no
+    forecast, or (None, None, None) if the ticker can't be parsed.
     """
-    m = _CONTRACT_RE.search(ticker)
-    if not m:
-        return None, None
-    temp_type = m.group(1)   # HIGH or LOWT
-    city = m.group(2)        # CHI, NYC, etc.
-    bet_type = m.group(3)    # B or T
-    value = float(m.group(4))
+    parsed = _parse_ticker(ticker)
+    if not parsed:
+        return None, None, None
+    # HIGH or LOWT, CHI/NYC/etc., B or T, bound
+    temp_type, city, bet_type, value = parsed
 
     forecast = forecast_high if temp_type == "HIGH" else forecast_low
     if forecast is None:
-        return None, city
+        return None, None, city
 
-    sd_table = FORECAST_ERROR_SD.get(city, _DEFAULT_SD)
     # Season is determined per-call from the target date (set in compute_contract_probabilities)
-    sd = sd_table.get(_current_season, 3.0)
+    sd = _SD_BY_CITY_SEASON.get((city, _current_season)) or _DEFAULT_SD.get(_current_season, 3.0)
+    inv_sd = 1.0 / sd
 
     if bet_type == "B":
         # Between: B54.5 means range [54, 55], wins if round(actual) in {54, 55}
         low_bound = int(value)
         high_bound = low_bound + 1
-        prob = norm.cdf(high_bound + 0.5, forecast, sd) - norm.cdf(low_bound - 0.5, forecast, sd)
-    else:
-        # Threshold: direction determined by yes_sub_title
-        # "X° or above" → P(YES) = P(temp > threshold) = 1 - CDF(threshold + 0.5)
-        # "X° or below" → P(YES) = P(temp < threshold) = CDF(threshold - 0.5)
-        threshold = int(value)
-        if "below" in yes_sub_title.lower():
-            # Lower tail: YES wins if temp < threshold
-            prob = norm.cdf(threshold - 0.5, forecast, sd)
-        else:
-            # Upper tail (default): YES wins if temp > threshold
-            prob = 1.0 - norm.cdf(threshold + 0.5, forecast, sd)
-
-    return max(0.0, min(1.0, prob)), city
+        return (high_bound + 0.5 - forecast) * inv_sd, (low_bound - 0.5 - forecast) * inv_sd, city
+    # Threshold: direction determined by yes_sub_title
+    # "X° or above" → P(YES) = P(temp > threshold) = 1 - CDF(threshold + 0.5)
+    # "X° or below" → P(YES) = P(temp < threshold) = CDF(threshold - 0.5)
+    threshold = int(value)
+    if "below" in yes_sub_title.lower():
+        # Lower tail: YES wins if temp < threshold
+        return (threshold - 0.5 - forecast) * inv_sd, -math.inf, city
+    # Upper tail (default): YES wins if temp > threshold
+    return math.inf, (threshold + 0.5 - forecast) * inv_sd, city
 
 
 # Module-level season cache (set before computing probabilities)
@@ -147,13 +220,47 @@ _ticker_titles = {}
 _city_forecasts = {}
 
 
+def _crossing_costs(ob):
+    """(cost_yes, cost_no) in cents to take the book, None where that side is empty."""
+    yes_bids = ob.get("yes") or []
+    no_bids = ob.get("no") or []
+
+    # Cost to buy YES = cross the NO side (100 - best_no_bid)
+    # Kalshi orderbook is sorted ascending by price; best bid = last entry
+    cost_yes = cost_no = None
+    # Levels are [price, qty] (fetch_bundle normalizes them)
+    if no_bids:
+        cost_yes = 100 - no_bids[-1][0]
+    # Cost to buy NO = cross the YES side (100 - best_yes_bid)
+    if yes_bids:
+        cost_no = 100 - yes_bids[-1][0]
+    return cost_yes, cost_no
+
+
+def _tradeable(cost):
+    """True if place_order would accept this cost (inside the 15-85c price band)."""
+    return cost is not None and MIN_PRICE_CENTS <= cost <= MAX_PRICE_CENTS
+
+
+def _out_of_band(cost):
+    """True if there is a price and place_order would reject it."""
+    return cost is not None and not MIN_PRICE_CENTS <= cost <= MAX_PRICE_CENTS
+
+
 def compute_contract_probabilities(bundle, target_date):
-    """Attach model_prob, ev_yes, ev_no to each contract in the bundle."""
+    """Attach model_prob, ev_yes, ev_no to each contract in the bundle.
+
+    Contracts priced outside place_order's 15-85c band on both sides get no
+    model output, and a side that is unpriced or out of band gets no EV.
+    """
     global _current_season, _ticker_titles, _city_forecasts
     _current_season = _get_season(target_date)
     _ticker_titles = {}
     _city_forecasts = {}
 
+    # Pass 1: crossing prices, and standardized bounds for every contract
+    # with a forecast that isn't auto-rejected on both sides
+    modeled, z_bounds = [], []
     for code, city in bundle.get("cities", {}).items():
         w = city.get("weather", {})
         forecast_high = w.get("predicted_high_f")
@@ -165,38 +272,33 @@ def compute_contract_probabilities(bundle, target_date):
             for c in mdata.get("contracts", []):
                 yes_sub = c.get("yes_sub_title", "")
                 _ticker_titles[c["ticker"]] = yes_sub
-                prob, _ = _contract_prob(c["ticker"], forecast_high, forecast_low, yes_sub)
-                if prob is None:
+                cost_yes, cost_no = _crossing_costs(c.get("orderbook") or {})
+                c["cost_yes"] = cost_yes
+                c["cost_no"] = cost_no
+                if _out_of_band(cost_yes) and _out_of_band(cost_no):
                     continue
-                c["model_prob"] = round(prob, 3)
-
-                # Compute EV at crossing prices
-                ob = c.get("orderbook") or {}
-                yes_bids = ob.get("yes") or []
-                no_bids = ob.get("no") or []
-
-                # Cost to buy YES = cross the NO side (100 - best_no_bid)
-                # Kalshi orderbook is sorted ascending by price; best bid = last entry
-                if no_bids:
-                    best_no_bid = no_bids[-1][0] if isinstance(no_bids[-1], list) else no_bids[-1]
-                    cost_yes = 100 - best_no_bid
-                    ev_yes = prob * (100 - cost_yes) - (1 - prob) * cost_yes
-                    c["cost_yes"] = cost_yes
-                    c["ev_yes"] = round(ev_yes, 1)
-                else:
-                    c["cost_yes"] = None
-                    c["ev_yes"] = None
-
-                # Cost to buy NO = cross the YES side (100 - best_yes_bid)
-                if yes_bids:
-                    best_yes_bid = yes_bids[-1][0] if isinstance(yes_bids[-1], list) else yes_bids[-1]
-                    cost_no = 100 - best_yes_bid
-                    ev_no = (1 - prob) * (100 - cost_no) - prob * cost_no
-                    c["cost_no"] = cost_no
-                    c["ev_no"] = round(ev_no, 1)
-                else:
-                    c["cost_no"] = None
-                    c["ev_no"] = None
+                z_upper, z_lower, _ = _contract_z_bounds(c["ticker"], forecast_high, forecast_low, yes_sub)
+                if z_upper is None:
+                    continue
+                modeled.append(c)
+                z_bounds.append((z_upper, z_lower))
+
+    # One ndtr call for every bound of every contract
+    cdf = ndtr(np.array(z_bounds, dtype=float).reshape(-1, 2))
+    model_probs = np.clip(cdf[:, 0] - cdf[:, 1], 0.0, 1.0).tolist()
+
+    # Pass 2: score EVs in one batch (NaN cost -> no EV for that side)
+    probs, costs_yes, costs_no = [], [], []
+    for c, prob in zip(modeled, model_probs):
+        c["model_prob"] = round(prob, 3)
+        probs.append(prob)
+        costs_yes.append(c["cost_yes"] if _tradeable(c["cost_yes"]) else float("nan"))
+        costs_no.append(c["cost_no"] if _tradeable(c["cost_no"]) else float("nan"))
+
+    ev_yes, ev_no = contract_ev(probs, costs_yes, costs_no)
+    for c, ey, en in zip(modeled, ev_yes.tolist(), ev_no.tolist()):
+        c["ev_yes"] = round(ey, 1) if _tradeable(c["cost_yes"]) else None
+        c["ev_no"] = round(en, 1) if _tradeable(c["cost_no"]) else None
 
     sd_used = FORECAST_ERROR_SD.get(list(bundle.get("cities", {}).keys())[0] if bundle.get("cities") else "CHI", _DEFAULT_SD)
     print(f"[MODEL] Season: {_current_season}, example SD: {sd_used[_current_season]}F")
@@ -206,117 +308,161 @@ def compute_contract_probabilities(bundle, target_date):
 # Data fetching from Cloudflare Worker
 # ---------------------------------------------------------------------------
 
+# Keep-alive session for the Worker. Concurrent batches each hold a pooled connection
+# (pool_maxsize covers fetch_bundle's 4 threads) and retries reuse it instead of a new TLS handshake.
+# Connection failures retry immediately; 502/503/504 retry with exponential back-off;
+# other HTTP errors aren't retried. A read timeout is retried once.
+_worker_session = requests.Session()
+_worker_session.mount("https://", HTTPAdapter(
+    pool_connections=4, pool_maxsize=8,
+    max_retries=Retry(total=3, read=1, backoff_factor=0.3,
+                      status_forcelist=(502, 503, 504), allowed_methods=("GET",)),
+))
+# Advertise every encoding urllib3 can decode here (adds br/zstd when
+# brotli/zstandard are installed), rather than requests' fixed "gzip, deflate"
+_worker_session.headers["Accept-Encoding"] = ACCEPT_ENCODING
+atexit.register(_worker_session.close)
+
+
 def _fetch_worker(target_date, city_codes):
     """Single Worker call for a batch of cities."""
     params = {"date": target_date, "cities": ",".join(city_codes)}
-    url = f"{WORKER_URL}/bundle"
-    for attempt in range(2):
-        try:
-            r = requests.get(url, params=params, timeout=45)
-            r.raise_for_status()
-            return r.json()
-        except Exception as e:
-            if attempt == 0:
-                print(f"  Worker fetch failed ({e}), retrying...")
-                time.sleep(2)
-            else:
-                raise
+    r = _worker_session.get(f"{WORKER_URL}/bundle", params=params, timeout=(3.05, 45))
+    r.raise_for_status()
+    return r.json()
+
 
+def fetch_bundle(target_date, cities, use_cache=False):
+    """Fetch data from Worker in concurrent batches of 3 (avoids Cloudflare 50-subrequest limit).
 
-def fetch_bundle(target_date, cities):
-    """Fetch data from Worker in batches of 3 (avoids Cloudflare 50-subrequest limit)."""
+    With use_cache=True (dry runs with --cached) the merged bundle is read from
+    and written to the tool cache for a few seconds, so a back-to-back run for
+    the same date and cities reuses it instead of refetching. Otherwise the
+    cache is not touched.
+    """
+    cache_args = {"target_date": target_date, "cities": sorted(cities)}
+    if use_cache:
+        cached = cache_get("worker_bundle", cache_args)
+        if cached is not None:
+            print("  [FETCH] Using bundle cached by a run moments ago (drop --cached to refetch)")
+            return json.loads(cached)
     BATCH_SIZE = 3
+    batches = [cities[i:i + BATCH_SIZE] for i in range(0, len(cities), BATCH_SIZE)]
+    for n, batch in enumerate(batches, 1):
+        print(f"  [FETCH] Batch {n}: {', '.join(batch)}")
+    # Each batch is its own Worker invocation (own subrequest budget), so they can run at once
+    with ThreadPoolExecutor(max_workers=min(4, len(batches)) or 1) as pool:
+        results = list(pool.map(lambda batch: _fetch_worker(target_date, batch), batches))
     merged = {"generated_at": None, "target_date": target_date, "cities": {}, "errors": []}
-    for i in range(0, len(cities), BATCH_SIZE):
-        batch = cities[i:i + BATCH_SIZE]
-        print(f"  [FETCH] Batch {i // BATCH_SIZE + 1}: {', '.join(batch)}")
-        result = _fetch_worker(target_date, batch)
+    for result in results:
         merged["generated_at"] = result.get("generated_at")
         merged["cities"].update(result.get("cities", {}))
         merged["errors"].extend(result.get("errors", []))
+    _normalize_orderbooks(merged)
+    if use_cache and not merged["errors"]:
+        cache_set("worker_bundle", cache_args, json.dumps(merged))
     return merged
 
 
+def _normalize_orderbooks(bundle):
+    """Rewrite every orderbook side as [[price, qty], ...] (bare prices get qty None),
+    so consumers can read book[-1][0] without checking the level's shape."""
+    for city in bundle.get("cities", {}).values():
+        for mdata in city.get("markets", {}).values():
+            for c in mdata.get("contracts", []):
+                ob = c.get("orderbook")
+                if not ob:
+                    continue
+                for side in ("yes", "no"):
+                    levels = ob.get(side)
+                    if levels and not all(isinstance(lv, list) for lv in levels):
+                        ob[side] = [lv if isinstance(lv, list) else [lv, None] for lv in levels]
+
+
+def _book_levels(levels):
+    # Levels _normalize_orderbooks padded with qty None go back to bare prices,
+    # so the prompt shows the book exactly as the Worker sent it
+    return [lv[0] if lv[1] is None else lv for lv in (levels or [])[:3]]
+
+
+def _book_summary(ob):
+    """Top three levels of each side, e.g. "book: YES [[40, 3], ...] NO [...]"."""
+    if not ob:
+        return "no orderbook"
+    return f"book: YES {_book_levels(ob.get('yes'))} NO {_book_levels(ob.get('no'))}"
+
+
 def format_bundle_for_claude(bundle):
     """Convert the Worker JSON bundle into readable text for Claude's prompt."""
-    lines = []
+    buf = io.StringIO()
+    w = buf.write  # every line is written newline-terminated; the last one is trimmed
     for code, city in bundle.get("cities", {}).items():
-        w = city.get("weather", {})
-        lines.append(f"=== {city.get('city_name', code)} ({code}) ===")
+        weather = city.get("weather", {})
+        markets = city.get("markets", {})
+        w(f"=== {city.get('city_name', code)} ({code}) ===\n")
 
         # Weather forecast
-        high = w.get("predicted_high_f")
-        low = w.get("predicted_low_f")
-        current = w.get("current_temp_f")
-        high_hour = w.get("high_hour", "")
-        low_hour = w.get("low_hour", "")
-        if w.get("error"):
-            lines.append(f"FORECAST: ERROR - {w['error']}")
+        if weather.get("error"):
+            # No forecast means no model probabilities -- don't spend prompt tokens
+            # on this city's contracts
+            w(f"FORECAST: ERROR - {weather['error']}\n")
+            w("MARKETS: omitted (no forecast for this city)\n\n")
+            continue
         else:
-            lines.append(f"FORECAST: High {high}F ({high_hour or '?'}), Low {low}F ({low_hour or '?'})")
+            w(f"FORECAST: High {weather.get('predicted_high_f')}F ({weather.get('high_hour', '') or '?'}), "
+              f"Low {weather.get('predicted_low_f')}F ({weather.get('low_hour', '') or '?'})\n")
+            current = weather.get("current_temp_f")
             if current is not None:
-                lines.append(f"CURRENT OBS: {current}F (as of {w.get('observed_at', '?')})")
+                w(f"CURRENT OBS: {current}F (as of {weather.get('observed_at', '?')})\n")
 
         # Hourly temps (condensed)
-        hourly = w.get("hourly", [])
+        hourly = weather.get("hourly", [])
         if hourly:
-            temps = [f"{h.get('time','')[11:16]}={h['temp_f']}F" for h in hourly[:24]]
-            lines.append(f"HOURLY: {', '.join(temps)}")
+            temps = ", ".join([f"{h.get('time','')[11:16]}={h['temp_f']}F" for h in islice(hourly, 24)])
+            w(f"HOURLY: {temps}\n")
 
         # Markets
-        for mtype in ("high", "low"):
-            mdata = city.get("markets", {}).get(mtype, {})
+        for mtype, label in (("high", "HIGH TEMP"), ("low", "LOW TEMP")):
+            mdata = markets.get(mtype, {})
             contracts = mdata.get("contracts", [])
             series = mdata.get("series_ticker", "")
-            label = "HIGH TEMP" if mtype == "high" else "LOW TEMP"
             if not contracts:
-                lines.append(f"\n{label} MARKETS ({series}): No contracts found for this date")
+                w(f"\n{label} MARKETS ({series}): No contracts found for this date\n")
                 continue
-            lines.append(f"\n{label} MARKETS ({series}):")
+            w(f"\n{label} MARKETS ({series}):\n")
             for c in contracts:
-                ob = c.get("orderbook") or {}
-                yes_bids = ob.get("yes") or []
-                no_bids = ob.get("no") or []
-                ob_str = f"book: YES {yes_bids[:3]} NO {no_bids[:3]}" if ob else "no orderbook"
+                c_get = c.get
+                ob_str = _book_summary(c_get("orderbook"))
 
                 # Model probability and EV (computed by compute_contract_probabilities)
-                mp = c.get("model_prob")
+                mp = c_get("model_prob")
                 model_str = ""
                 if mp is not None:
-                    ev_y = c.get("ev_yes")
-                    ev_n = c.get("ev_no")
+                    ev_y = c_get("ev_yes")
+                    ev_n = c_get("ev_no")
                     ev_y_str = f"{ev_y:+.0f}c" if ev_y is not None else "N/A"
                     ev_n_str = f"{ev_n:+.0f}c" if ev_n is not None else "N/A"
                     model_str = f" | MODEL_PROB={mp:.2f} EV_YES={ev_y_str} EV_NO={ev_n_str}"
 
-                lines.append(
-                    f"  {c['ticker']} \"{c.get('yes_sub_title', c.get('title',''))}\" | "
-                    f"yes_bid={c.get('yes_bid')} yes_ask={c.get('yes_ask')} "
-                    f"last={c.get('last_price')} vol={c.get('volume')} | {ob_str}{model_str}"
+                w(
+                    f"  {c['ticker']} \"{c_get('yes_sub_title', c_get('title',''))}\" | "
+                    f"yes_bid={c_get('yes_bid')} yes_ask={c_get('yes_ask')} "
+                    f"last={c_get('last_price')} vol={c_get('volume')} | {ob_str}{model_str}\n"
                 )
 
-        lines.append("")  # blank line between cities
+        w("\n")  # blank line between cities
 
-    return "\n".join(lines)
+    return buf.getvalue()[:-1]
 
 
 # ---------------------------------------------------------------------------
 # System prompt
 # ---------------------------------------------------------------------------
 
-def build_system_prompt(now, target_date, mode, dry_run):
-    now_str = now.strftime("%I:%M %p CST on %A, %B %d, %Y")
-    mode_note = (
-        "place_order is simulated, no real money"
-        if dry_run
-        else "ORDERS WILL EXECUTE WITH REAL MONEY"
-    )
-
-    return f"""You are a Kalshi prediction market betting agent specializing in daily temperature markets.
-
-TARGET DATE: {target_date}
-CURRENT TIME: {now_str}
-MODE: {mode} -- {mode_note}
+# Static instructions -- identical on every turn and every run, so this block
+# is sent first and marked for Anthropic prompt caching. Anything that changes
+# per run (date, time, mode) goes in the small header built below.
+STATIC_SYSTEM_PROMPT = """You are a Kalshi prediction market betting agent specializing in daily temperature markets.
 
 You have been given complete weather forecast data and Kalshi market data for all target cities.
 Analyze the data and place bets where you find edge. You have two tools: place_order and get_account_balance.
@@ -340,7 +486,7 @@ WHY THIS MATTERS:
 - Always check whether the threshold is strict > or inclusive >= before estimating probability
 
 PROBABILITY MODEL:
-Each contract includes MODEL_PROB and EV_YES/EV_NO, computed from a statistical model
+Each tradeable contract includes MODEL_PROB and EV_YES/EV_NO, computed from a statistical model
 of NWS forecast error (normal distribution with city/season-specific standard deviations
 from published research). These are MORE ACCURATE than gut estimates.
 
@@ -351,7 +497,8 @@ DECISION RULE:
 - ONLY bet when EV > +5 cents per contract (this is a 5%+ edge)
 - Prefer bets with higher EV
 - If no contracts show EV > +5, pass entirely -- "no bets today" is a valid and common outcome
-- Contracts priced below 15c or above 85c are auto-rejected by the system
+- Contracts priced below 15c or above 85c are auto-rejected by the system; that side's EV shows N/A,
+  and contracts rejected on both sides show no MODEL_PROB at all
 - Check BOTH EV_YES and EV_NO for each contract -- the edge is often on the NO side
 
 ORDERBOOK EXECUTION:
@@ -367,202 +514,347 @@ For thin edges (EV < +5c), skip.
 RULES:
 - TRUST THE MODEL: use MODEL_PROB and EV values, not gut feeling
 - Skip if no good opportunities exist -- many days will have 0-3 bets
-- Check get_account_balance before placing bets
+- CURRENT BALANCE is given in the header when available; only call get_account_balance
+  if it's missing or you need a refresh before placing bets
 - Print a summary table at the end: | City | Contract | MODEL_PROB | Side | Cost | EV | Filled? |"""
 
 
+# Built once; the only per-run text is the short header below
+_STATIC_SYSTEM_BLOCK = {"type": "text", "text": STATIC_SYSTEM_PROMPT, "cache_control": {"type": "ephemeral"}}
+_PROMPT_HEADER = "TARGET DATE: {target_date}\nCURRENT TIME: {now_str}\nMODE: {mode} -- {mode_note}"
+_BALANCE_LINE = "\nCURRENT BALANCE: ${balance_dollars:.2f} (portfolio value ${portfolio_value_dollars:.2f})"
+_MODE_NOTES = {
+    True: "place_order is simulated, no real money",
+    False: "ORDERS WILL EXECUTE WITH REAL MONEY",
+}
+
+
+@lru_cache(maxsize=64)
+def _run_header(now_str, target_date, mode, dry_run):
+    return _PROMPT_HEADER.format(target_date=target_date, now_str=now_str, mode=mode,
+                                 mode_note=_MODE_NOTES[bool(dry_run)])
+
+
+def build_system_prompt(now, target_date, mode, dry_run, balance=None):
+    """Return the system prompt as content blocks: cached static rules + run header.
+
+    balance is the get_account_balance result fetched up front, if it succeeded.
+    """
+    # Header text is memoized per minute; the blocks list is built fresh each call
+    header = _run_header(now.strftime("%I:%M %p CST on %A, %B %d, %Y"), target_date, mode, dry_run)
+    if balance and "error" not in balance:
+        header += _BALANCE_LINE.format(**balance)
+    return [_STATIC_SYSTEM_BLOCK, {"type": "text", "text": header}]
+
+
 # ---------------------------------------------------------------------------
 # Tool dispatch (only trading tools now)
 # ---------------------------------------------------------------------------
 
+# Compact JSON for tool results: no padding after separators, so fewer
+# characters/tokens go back to the model each turn
+_to_json = json.JSONEncoder(separators=(",", ":")).encode
+
+
+def _error(msg, **extra):
+    """JSON error payload returned to Claude as a tool_result."""
+    return _to_json({"error": msg, **extra})
+
+
+def _handle_get_account_balance(inp, pk, api_key_id, base_url, dry_run, mode, target_date):
+    return _to_json(tool_get_account_balance(pk, api_key_id, base_url))
+
+
+_PLACE_ORDER_FIELDS = ("ticker", "side", "yes_price_cents", "contracts")
+
+
+def _positions_for(target_date):
+    """Live positions and per-city bet counts already in the trade log for target_date."""
+    snap = _logged_positions.get(target_date)
+    if snap is None:
+        # A previous run in this process may still have rows queued
+        flush_trade_log()
+        snap = (get_existing_tickers(target_date), get_city_bet_count(target_date))
+        _logged_positions[target_date] = snap
+    return snap
+
+
+def _handle_place_order(inp, pk, api_key_id, base_url, dry_run, mode, target_date):
+    """Apply the hard guardrails, place the order, then track spend and log it."""
+    global _run_spend_cents
+    missing = [f for f in _PLACE_ORDER_FIELDS if f not in inp]
+    if missing:
+        return _error(f"Missing required field(s): {', '.join(missing)}")
+    ticker = inp["ticker"]
+    if not isinstance(ticker, str) or not _valid_ticker(ticker):
+        return _error(f"Invalid ticker format: {ticker!r}")
+
+    side = inp["side"]
+    ypc = inp["yes_price_cents"]
+    count = inp["contracts"]
+    if side not in _SIDE_SIGN:
+        return _error(f"Invalid side: {side!r} (must be 'yes' or 'no')")
+    # Cost per contract: ypc for YES, 100 - ypc for NO
+    cost_per = 50 + _SIDE_SIGN[side] * (ypc - 50)
+
+    # --- Hard guardrail: Per-run spending cap ---
+    # (checks run cheapest first; the trade-log lookups come last)
+    cost_this_order = cost_per * count
+    remaining = _MAX_RUN_CENTS - _run_spend_cents
+    if cost_this_order > remaining:
+        return _error(
+            _RUN_CAP_ERROR.format(cost=cost_this_order, remaining=remaining,
+                                  spent=_run_spend_cents / 100),
+            suggestion="Reduce contracts or skip this bet.",
+        )
+
+    # --- Hard guardrail: Negative-EV blocking ---
+    est_prob = inp.get("est_probability")
+    if est_prob is not None:
+        if side == "yes":
+            ev = est_prob * (100 - cost_per) - (1 - est_prob) * cost_per
+        else:
+            ev = (1 - est_prob) * (100 - cost_per) - est_prob * cost_per
+        if ev < 0:
+            return _error(f"NEGATIVE EV BLOCKED: EV is {ev:.1f}c (negative). This bet loses money on average. Skipping.")
+
+    # --- Hard guardrail: Deduplication ---
+    existing, city_counts = _positions_for(target_date)
+    if ticker in {t for t, _ in existing}:
+        return _error(f"DEDUP BLOCKED: Already have a position on {ticker} for {target_date}. Skipping duplicate.")
+
+    # --- Hard guardrail: Contradictory bet blocking ---
+    opposite = "no" if side == "yes" else "yes"
+    if (ticker, opposite) in existing:
+        return _error(f"CONFLICT BLOCKED: Already hold {opposite.upper()} on {ticker}. Cannot bet {side.upper()} on same contract.")
+
+    # --- Hard guardrail: City limit ---
+    city_code = _city_from_ticker(ticker)
+    if city_code:
+        run_city = _run_city_bets.get(city_code, 0)
+        total_city = city_counts.get(city_code, 0) + run_city
+        if total_city >= MAX_BETS_PER_CITY:
+            return _error(f"CITY LIMIT: {city_code} already has {total_city} bet(s) for {target_date} (max {MAX_BETS_PER_CITY}). Skip this city.")
+    parsed = tool_place_order(pk, api_key_id, base_url, dry_run, ticker, side, ypc, count)
+    if "error" in parsed:
+        return _to_json(parsed)
+
+    # Track spend and log the trade
+    resp = parsed.get("response")
+    if "would_place" in parsed:
+        actual_cost = parsed["cost_cents"]
+    elif resp is not None:
+        actual_cost = resp.get("_cost_cents", 0)
+    else:
+        actual_cost = cost_this_order
+    _run_spend_cents += actual_cost
+    print(f"  [SPEND] ${actual_cost/100:.2f} this order | ${_run_spend_cents/100:.2f} / ${MAX_RUN_DOLLARS:.2f} run total")
+    # Track per-city bet count for this run
+    if city_code:
+        _run_city_bets[city_code] = _run_city_bets.get(city_code, 0) + 1
+    # Same rows get_existing_tickers()/get_city_bet_count() would now return
+    # (they skip dry runs)
+    if not dry_run:
+        existing.add((ticker, side))
+        city_counts[city_code] = city_counts.get(city_code, 0) + 1
+    city = city_code
+    filled = False
+    order_id = None
+    if not dry_run and resp is not None:
+        order_data = resp.get("order", resp)
+        filled = (order_data.get("fill_count") or 0) > 0
+        order_id = order_data.get("order_id") or order_data.get("client_order_id")
+    ev = None
+    if est_prob is not None:
+        ev = est_prob * (100 - cost_per) - (1 - est_prob) * cost_per
+    trade_title = _ticker_titles.get(ticker, "")
+    fc = _city_forecasts.get(city, (None, None))
+    log_trade_async(
+        mode=mode, target_date=target_date, city=city,
+        ticker=ticker, title=trade_title, side=side,
+        yes_price_cents=ypc, contracts=count,
+        forecast_high_f=fc[0], forecast_low_f=fc[1],
+        est_probability=est_prob, expected_value_cents=ev,
+        filled=filled, order_id=order_id, dry_run=dry_run,
+    )
+    return _to_json(parsed)
+
+
+# Tool name -> handler(inp, pk, api_key_id, base_url, dry_run, mode, target_date)
+_TOOL_HANDLERS = {
+    "get_account_balance": _handle_get_account_balance,
+    "place_order": _handle_place_order,
+}
+
+
 def dispatch_tool(name, inp, pk, api_key_id, base_url, dry_run, mode="", target_date=""):
     """Route a tool call to the correct function."""
-    if name == "get_account_balance":
-        return tool_get_account_balance(pk, api_key_id, base_url)
-    elif name == "place_order":
-        global _run_spend_cents
-        ticker = inp["ticker"]
-        if not _TICKER_RE.match(ticker):
-            return json.dumps({"error": f"Invalid ticker format: {ticker!r}"})
-
-        side = inp["side"]
-        ypc = inp["yes_price_cents"]
-        count = inp["contracts"]
-
-        # --- Hard guardrail: Deduplication ---
-        existing = get_existing_tickers(target_date)
-        if ticker in {t for t, _ in existing}:
-            return json.dumps({"error": f"DEDUP BLOCKED: Already have a position on {ticker} for {target_date}. Skipping duplicate."})
-
-        # --- Hard guardrail: Contradictory bet blocking ---
-        opposite = "no" if side == "yes" else "yes"
-        if (ticker, opposite) in existing:
-            return json.dumps({"error": f"CONFLICT BLOCKED: Already hold {opposite.upper()} on {ticker}. Cannot bet {side.upper()} on same contract."})
-
-        # --- Hard guardrail: City limit ---
-        city_code = ""
-        for code in CITY_CONFIGS:
-            if code in ticker:
-                city_code = code
-                break
-        if city_code:
-            city_counts = get_city_bet_count(target_date)
-            run_city = _run_city_bets.get(city_code, 0)
-            total_city = city_counts.get(city_code, 0) + run_city
-            if total_city >= MAX_BETS_PER_CITY:
-                return json.dumps({"error": f"CITY LIMIT: {city_code} already has {total_city} bet(s) for {target_date} (max {MAX_BETS_PER_CITY}). Skip this city."})
-
-        # --- Hard guardrail: Negative-EV blocking ---
-        est_prob = inp.get("est_probability")
-        if est_prob is not None:
-            cost_c = ypc if side == "yes" else 100 - ypc
-            if side == "yes":
-                ev = est_prob * (100 - cost_c) - (1 - est_prob) * cost_c
-            else:
-                ev = (1 - est_prob) * (100 - cost_c) - est_prob * cost_c
-            if ev < 0:
-                return json.dumps({"error": f"NEGATIVE EV BLOCKED: EV is {ev:.1f}c (negative). This bet loses money on average. Skipping."})
-
-        # Per-run spending cap
-        cost_this_order = (ypc if side == "yes" else 100 - ypc) * count
-        if (_run_spend_cents + cost_this_order) > int(MAX_RUN_DOLLARS * 100):
-            remaining = int(MAX_RUN_DOLLARS * 100) - _run_spend_cents
-            return json.dumps({
-                "error": f"RUN SPENDING CAP: This order costs {cost_this_order}c but only "
-                         f"{remaining}c remains of the ${MAX_RUN_DOLLARS:.0f} per-run limit. "
-                         f"Already committed ${_run_spend_cents/100:.2f} this run.",
-                "suggestion": "Reduce contracts or skip this bet."
-            })
-        result = tool_place_order(pk, api_key_id, base_url, dry_run, ticker, side, ypc, count)
-        # Track spend and log the trade
-        try:
-            parsed = json.loads(result)
-            if "error" not in parsed:
-                if "would_place" in parsed:
-                    actual_cost = int(parsed["cost_dollars"] * 100)
-                elif "response" in parsed:
-                    actual_cost = int(parsed["response"].get("_cost_dollars", 0) * 100)
-                else:
-                    actual_cost = cost_this_order
-                _run_spend_cents += actual_cost
-                print(f"  [SPEND] ${actual_cost/100:.2f} this order | ${_run_spend_cents/100:.2f} / ${MAX_RUN_DOLLARS:.2f} run total")
-                # Track per-city bet count for this run
-                if city_code:
-                    _run_city_bets[city_code] = _run_city_bets.get(city_code, 0) + 1
-                city = city_code or ""
-                if not city:
-                    for code in CITY_CONFIGS:
-                        if code in ticker:
-                            city = code
-                            break
-                filled = False
-                order_id = None
-                if not dry_run and "response" in parsed:
-                    resp = parsed["response"]
-                    order_data = resp.get("order", resp)
-                    filled = order_data.get("fill_count", 0) > 0
-                    order_id = order_data.get("order_id", order_data.get("client_order_id"))
-                est_prob = inp.get("est_probability")
-                ev = None
-                if est_prob is not None:
-                    cost_c = ypc if side == "yes" else 100 - ypc
-                    ev = est_prob * (100 - cost_c) - (1 - est_prob) * cost_c
-                trade_title = _ticker_titles.get(ticker, "")
-                fc = _city_forecasts.get(city, (None, None))
-                log_trade(
-                    mode=mode, target_date=target_date, city=city,
-                    ticker=ticker, title=trade_title, side=side,
-                    yes_price_cents=ypc, contracts=count,
-                    forecast_high_f=fc[0], forecast_low_f=fc[1],
-                    est_probability=est_prob, expected_value_cents=ev,
-                    filled=filled, order_id=order_id, dry_run=dry_run,
-                )
-        except Exception:
-            pass
-        return result
-    else:
-        return json.dumps({"error": f"Unknown tool: {name}"})
+    handler = _TOOL_HANDLERS.get(name)
+    if handler is None:
+        return _error(f"Unknown tool: {name}")
+    return handler(inp, pk, api_key_id, base_url, dry_run, mode, target_date)
 
 
 # ---------------------------------------------------------------------------
 # Agent loop (typically 1-2 turns)
 # ---------------------------------------------------------------------------
 
+@lru_cache(maxsize=1)
+def _get_anthropic_client(api_key):
+    """Process-wide Anthropic client: one keep-alive connection pool shared by every
+    turn, and by every run when main() is called repeatedly from a long-lived process."""
+    client = anthropic.Anthropic(api_key=api_key, http_client=anthropic.DefaultHttpxClient(),
+                                 max_retries=5)
+    atexit.register(client.close)
+    return client
+
+
+# Tool results from the most recent turns stay verbatim; older ones are
+# replaced with a stub so orderbook/forecast JSON isn't resent every turn.
+KEEP_FULL_TOOL_TURNS = 2
+
+
+def _truncate_stale_tool_results(messages):
+    """Stub out the tool_result message that just fell outside the last
+    KEEP_FULL_TOOL_TURNS turns. Called after each tool_results append, so each
+    message is rewritten exactly once."""
+    # messages alternate user/assistant, so tool results sit 2 apart from the end
+    idx = len(messages) - 1 - 2 * KEEP_FULL_TOOL_TURNS
+    if idx < 1 or messages[idx]["role"] != "user":
+        return
+    messages[idx]["content"] = [
+        {
+            "type": "tool_result",
+            "tool_use_id": r["tool_use_id"],
+            "content": f"[truncated: previously returned {len(r['content'])} chars]",
+        }
+        for r in messages[idx]["content"]
+    ]
+
+
 def run_agent(client, system_prompt, user_prompt, tools, pk, api_key_id, base_url, dry_run,
               mode="", target_date=""):
     """Run the tool-use loop (max 3 turns, typically 1-2)."""
-    messages = [{"role": "user", "content": user_prompt}]
+    global _run_spend_cents
+    # Per-run guardrail state starts clean, even when main() runs again in-process
+    _run_spend_cents = 0
+    _run_city_bets.clear()
+    _logged_positions.clear()
+    # The bundle text is the bulk of the prompt and identical on every turn;
+    # a second cache breakpoint after it lets turn 2+ read it from the cache
+    messages = [{
+        "role": "user",
+        "content": [{"type": "text", "text": user_prompt, "cache_control": {"type": "ephemeral"}}],
+    }]
     token_log = []
+    response = None
+    tool_pool = ThreadPoolExecutor(max_workers=4)
 
     for turn in range(MAX_AGENT_TURNS):
         print(f"\n-- Turn {turn + 1} {'--' * 25}")
 
-        for attempt in range(3):
-            try:
-                response = client.messages.create(
-                    model=CLAUDE_MODEL,
-                    max_tokens=4096,
-                    system=system_prompt,
-                    tools=tools,
-                    messages=messages,
-                )
-                break
-            except anthropic.RateLimitError:
-                wait = 30 * (attempt + 1)
-                print(f"\n  Rate limited. Waiting {wait}s...")
-                time.sleep(wait)
-        else:
-            print("\n  Rate limit exceeded after retries. Stopping.")
+        # Stream the turn: print text as it arrives and start read-only tools
+        # as soon as their tool_use block is complete, while the model is
+        # still generating. place_order waits for the full message so the
+        # spend cap and city limits see each order in turn.
+        # Transient 429/5xx are retried inside the SDK (honors Retry-After).
+        prefetched = {}
+        tool_blocks = []
+        try:
+            with client.messages.stream(
+                model=CLAUDE_MODEL,
+                max_tokens=4096,
+                system=system_prompt,
+                tools=tools,
+                messages=messages,
+            ) as stream:
+                for event in stream:
+                    if event.type == "content_block_start" and event.content_block.type == "text":
+                        print()
+                    elif event.type == "text":
+                        print(event.text, end="", flush=_LIVE_OUTPUT)
+                    elif event.type == "content_block_stop":
+                        block = event.content_block
+                        if block.type == "text":
+                            print()
+                        elif block.type == "tool_use":
+                            tool_blocks.append(block)
+                            # Show the call as soon as its input is complete
+                            if log.isEnabledFor(logging.DEBUG):
+                                log.debug("\n[TOOL] %s(%s)", block.name,
+                                          _to_json(block.input))
+                            if block.name in _READ_ONLY_TOOLS:
+                                prefetched[block.id] = tool_pool.submit(
+                                    dispatch_tool, block.name, block.input, pk, api_key_id,
+                                    base_url, dry_run, mode=mode, target_date=target_date,
+                                )
+                response = stream.get_final_message()
+        except anthropic.APIStatusError as e:
+            print(f"\n  Claude API error after retries ({e.status_code}). Stopping.")
+            notify_error("agent.py", f"Claude API error: {e}")
             break
 
         blocks = response.content
         stop_reason = response.stop_reason
-        token_log.append((response.usage.input_tokens, response.usage.output_tokens))
+        usage = response.usage
+        token_log.append((usage.input_tokens, usage.output_tokens,
+                          getattr(usage, "cache_creation_input_tokens", None) or 0,
+                          getattr(usage, "cache_read_input_tokens", None) or 0))
         messages.append({"role": "assistant", "content": blocks})
 
-        # Print text blocks
-        for block in blocks:
-            if block.type == "text" and block.text.strip():
-                print(f"\n{block.text}")
-
-        if stop_reason == "end_turn":
-            print("\n-- Agent finished --")
+        # Only a tool_use turn needs another round trip. Anything else (end_turn,
+        # max_tokens, ...) ends the run; an incomplete turn isn't resent as-is.
+        if stop_reason != "tool_use":
+            if stop_reason == "end_turn":
+                print("\n-- Agent finished --")
+            else:
+                print(f"\n-- Agent stopped ({stop_reason}) --")
             break
 
         # Process tool calls
-        if stop_reason == "tool_use":
-            tool_results = []
-            for block in blocks:
-                if block.type != "tool_use":
-                    continue
-                name = block.name
-                inp = block.input
-                tool_id = block.id
-
-                print(f"\n[TOOL] {name}({json.dumps(inp, separators=(',', ':'))})")
+        tool_results = []
+        for block in tool_blocks:
+            name = block.name
+            inp = block.input
+            tool_id = block.id
+
+            if tool_id in prefetched:
+                result = prefetched[tool_id].result()
+            else:
                 result = dispatch_tool(name, inp, pk, api_key_id, base_url, dry_run,
                                        mode=mode, target_date=target_date)
-                preview = result[:400] + ("..." if len(result) > 400 else "")
-                print(f"  -> {preview}")
+            if log.isEnabledFor(logging.DEBUG):
+                log.debug("  %s -> %s%s", name, result[:400], "..." if len(result) > 400 else "")
+
+            tool_results.append({
+                "type": "tool_result",
+                "tool_use_id": tool_id,
+                "content": result,
+            })
 
-                tool_results.append({
-                    "type": "tool_result",
-                    "tool_use_id": tool_id,
-                    "content": result,
-                })
+        log.info("\n[TOOLS] %d tool result(s) returned", len(tool_results))
+        messages.append({"role": "user", "content": tool_results})
+        _truncate_stale_tool_results(messages)
 
-            messages.append({"role": "user", "content": tool_results})
+    tool_pool.shutdown()
 
     # Log token usage
     total_in = sum(u[0] for u in token_log)
     total_out = sum(u[1] for u in token_log)
+    total_cache_write = sum(u[2] for u in token_log)
+    total_cache_read = sum(u[3] for u in token_log)
     if response:
         usage = response.usage
         print(f"\n[TOKENS] Last turn: {usage.input_tokens} in / {usage.output_tokens} out")
     print(f"[TOKENS] Total: {total_in} in / {total_out} out")
+    if total_cache_write or total_cache_read:
+        print(f"[TOKENS] Prompt cache: {total_cache_write} written / {total_cache_read} read")
 
-    # Estimate API cost (Sonnet 4.5: $3/M in, $15/M out)
-    cost_estimate = total_in / 1_000_000 * 3 + total_out / 1_000_000 * 15
+    # Estimate API cost (Sonnet 4.5: $3/M in, $15/M out; cache writes 1.25x, reads 0.1x)
+    cost_estimate = (
+        (total_in + total_cache_write * 1.25 + total_cache_read * 0.1) / 1_000_000 * 3
+        + total_out / 1_000_000 * 15
+    )
     print(f"[COST] Estimated API spend: ${cost_estimate:.4f}")
 
     print(f"\n{'=' * 60}")
@@ -587,8 +879,25 @@ def main():
         "--history", action="store_true",
         help="Show trade history and P&L summary, then exit.",
     )
+    parser.add_argument(
+        "--quiet", action="store_true",
+        help="Hide per-tool call/result lines (for scheduled runs).",
+    )
+    parser.add_argument(
+        "--cached", action="store_true",
+        help="Dry runs only: reuse a Worker bundle from the last 30s instead of refetching.",
+    )
     args = parser.parse_args()
 
+    # Tool call/result lines are DEBUG; everything else still prints as before.
+    # The handler is added once, so repeat main() calls don't duplicate lines.
+    if not log.handlers:
+        handler = logging.StreamHandler(sys.stdout)
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        log.addHandler(handler)
+    log.setLevel(logging.INFO if args.quiet else logging.DEBUG)
+    log.propagate = False
+
     if args.history:
         print_history()
         sys.exit(0)
@@ -634,10 +943,10 @@ def main():
         target_date = tomorrow.isoformat()
 
     # Determine cities
-    cities = args.cities if args.cities else list(CITY_CONFIGS.keys())
-    valid_cities = [c for c in cities if c in CITY_CONFIGS]
+    cities = args.cities if args.cities else CITY_CODES_TUPLE
+    valid_cities = [c for c in cities if c in CITY_CODES]
     if not valid_cities:
-        print(f"Error: No valid city codes. Available: {list(CITY_CONFIGS.keys())}")
+        print(f"Error: No valid city codes. Available: {list(CITY_CODES_TUPLE)}")
         sys.exit(1)
 
     # Print banner
@@ -648,11 +957,22 @@ def main():
     print(f"  Cities: {', '.join(valid_cities)}")
     print(f"  Mode: {mode}")
     print(f"{'=' * 60}")
+    if args.cached and not dry_run:
+        print(f"  [FETCH] --cached is ignored for {mode} runs; fetching fresh Worker data")
 
-    # Step 1: Fetch data from Cloudflare Worker
+    # Step 1: Fetch data from Cloudflare Worker, with the account balance
+    # alongside so Claude doesn't need a turn to ask for it
     print(f"\n[FETCH] Getting data from Worker for {target_date}...")
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        balance_fut = pool.submit(tool_get_account_balance, pk, kalshi_key_id, base_url)
+        bundle_fut = pool.submit(fetch_bundle, target_date, valid_cities, use_cache=args.cached and dry_run)
+    balance = balance_fut.result()
+    if "error" in balance:
+        print(f"[BALANCE] Unavailable ({balance['error']}); Claude can call get_account_balance")
+    else:
+        print(f"[BALANCE] ${balance['balance_dollars']:.2f}")
     try:
-        bundle = fetch_bundle(target_date, valid_cities)
+        bundle = bundle_fut.result()
         print(f"[FETCH] Got data for {len(bundle.get('cities', {}))} cities")
         if bundle.get("errors"):
             for err in bundle["errors"]:
@@ -671,18 +991,19 @@ def main():
 
     # Step 4: Build prompt with all data included
     tools = TRADING_TOOL_DEFINITIONS
-    system_prompt = build_system_prompt(now, target_date, mode, dry_run)
+    system_prompt = build_system_prompt(now, target_date, mode, dry_run, balance=balance)
     user_prompt = (
         f"Here is all weather forecast and Kalshi market data for {target_date}.\n"
         f"Analyze every city, find value bets, and place orders.\n\n"
         f"{data_text}\n\n"
-        f"Check your balance first, then place any bets where you find edge. "
+        f"Place any bets where you find edge. "
         f"If no good opportunities exist, say so and explain why."
     )
 
     # Step 5: Run Claude (1-2 turns typically)
-    client = anthropic.Anthropic(api_key=api_key)
-    run_start = datetime.datetime.now(CST).isoformat()
+    client = _get_anthropic_client(api_key)
+    # Same instant as the prompt's CURRENT TIME, so the two can't drift apart
+    run_start = now.isoformat()
 
     token_stats = None
     try:
@@ -691,16 +1012,17 @@ def main():
     except Exception as e:
         notify_error("agent.py", str(e))
         raise
+    finally:
+        flush_trade_log()
 
     # Step 6: Send Discord notification for filled trades
     try:
-        recent = get_trade_history(limit=50)
-        run_trades = [t for t in recent
-                      if t["timestamp"] >= run_start
-                      and t["filled"]
-                      and not t["dry_run"]]
+        run_trades = get_trade_history(limit=None, since=run_start, filled_only=True,
+                                       include_dry_run=False)
         if run_trades:
-            notify_bets_placed(run_trades, mode, target_date, token_stats=token_stats)
+            fut = _NOTIFY_POOL.submit(notify_bets_placed, run_trades, mode, target_date,
+                                      token_stats=token_stats)
+            fut.result(timeout=NOTIFY_TIMEOUT_SECS)
     except Exception as e:
         print(f"[NOTIFY] Failed to send Discord notification: {e}")
 
@@ -19,14 +19,21 @@ Usage:
 import os
 import sys
 import json
-import time
+import atexit
 import re
+import math
 import argparse
 import datetime
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 
+import numpy as np
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util import Retry
+from urllib3.util.request import ACCEPT_ENCODING
 from dotenv import load_dotenv
-from scipy.stats import norm
+from scipy.special import ndtr
 
 from config import (
     CST,
@@ -35,14 +42,16 @@ from config import (
     MAX_BET_DOLLARS,
     MAX_CONTRACTS_PER_ORDER,
     MAX_RUN_DOLLARS,
-    CITY_CONFIGS,
+    CITY_CODES,
+    CITY_CODES_TUPLE,
     WORKER_URL,
 )
 
+from tools.ev import contract_ev
 from tools.kalshi_auth import load_private_key
 from tools.kalshi_trading import tool_get_account_balance, tool_place_order
-from tools.trade_log import log_trade, log_run, get_trade_history, get_existing_tickers, get_city_bet_count, export_dashboard_data
-from tools.notify import notify_bets_placed, notify_bet_logic, notify_error
+from tools.trade_log import log_trades, log_run, get_trade_history, get_existing_tickers, get_city_bet_count, export_dashboard_data
+from tools.notify import notify_bets_with_logic, notify_error
 
 # ---------------------------------------------------------------------------
 # Constants
@@ -52,6 +61,14 @@ MIN_EV_CENTS = 5       # minimum EV to place a bet
 MIN_PRICE_CENTS = 15   # mirrors kalshi_trading.py guardrail
 MAX_PRICE_CENTS = 85   # mirrors kalshi_trading.py guardrail
 MAX_BETS_PER_CITY = 2  # max bets per city per day
+NOTIFY_TIMEOUT_SECS = 10  # max wait for the Discord post at the end of a run
+MAX_RUN_CENTS = int(round(MAX_RUN_DOLLARS * 100))  # per-run spending cap, in cents
+MAX_BET_CENTS = int(round(MAX_BET_DOLLARS * 100))  # per-order cap, in cents
+ORDER_WORKERS = 4      # orders in flight at once (well under Kalshi's write rate limit)
+
+# Discord posts run off the main thread so the summary/export don't wait on them.
+# Shared by every main() call in the process, so it is never shut down.
+_NOTIFY_POOL = ThreadPoolExecutor(max_workers=1)
 
 CONTRACT_RE = re.compile(r"KX(HIGH|LOWT)([A-Z]+)-\d+[A-Z]+\d+-([BT])([\d\.]+)")
 
@@ -66,53 +83,63 @@ FORECAST_ERROR_SD = {
     "PHIL": {"winter": 6.0, "spring": 5.0, "summer": 3.5, "autumn": 5.0},
 }
 _DEFAULT_SD = {"winter": 6.0, "spring": 5.0, "summer": 3.5, "autumn": 5.0}
+# Same tables flattened to (city, season) -> SD: one lookup per contract
+_SD_BY_CITY_SEASON = {
+    (city, season): sd for city, table in FORECAST_ERROR_SD.items() for season, sd in table.items()
+}
 
 
 # ---------------------------------------------------------------------------
 # Probability model (same math as agent.py)
 # ---------------------------------------------------------------------------
 
+@lru_cache(maxsize=4096)
+def _parse_ticker(ticker):
+    """(temp_type, city, bet_type, value) from a contract ticker, or None. Memoized."""
+    m = CONTRACT_RE.search(ticker)
+    if not m:
+        return None
+    return m.group(1), m.group(2), m.group(3), float(m.group(4))
+
+
+# Meteorological season by month number (index 0 unused)
+_SEASON_BY_MONTH = (
+    None,
+    "winter", "winter", "spring", "spring", "spring", "summer",
+    "summer", "summer", "autumn", "autumn", "autumn", "winter",
+)
+
+
 def _get_season(date_str):
-    month = int(date_str[5:7])
-    if month in (12, 1, 2):
-        return "winter"
-    elif month in (3, 4, 5):
-        return "spring"
-    elif month in (6, 7, 8):
-        return "summer"
-    else:
-        return "autumn"
+    return _SEASON_BY_MONTH[int(date_str[5:7])]
 
 
-def _contract_prob(ticker, forecast_high, forecast_low, season, yes_sub_title=""):
-    """Compute P(YES wins) for a contract given NWS forecast temps (hardcoded SD fallback)."""
-    m = CONTRACT_RE.search(ticker)
-    if not m:
-        return None, None
-    temp_type = m.group(1)
-    city = m.group(2)
-    bet_type = m.group(3)
-    value = float(m.group(4))
+def _contract_z_bounds(ticker, forecast_high, forecast_low, season, yes_sub_title=""):
+    """Standardized bounds (z_upper, z_lower) where YES wins: P(YES) = ndtr(z_upper) - ndtr(z_lower).
+
+    Returns (z_upper, z_lower, city), with None bounds if there's no forecast
+    and (None, None, None) if the ticker can't be parsed.
+    """
+    parsed = _parse_ticker(ticker)
+    if not parsed:
+        return None, None, None
+    temp_type, city, bet_type, value = parsed
 
     forecast = forecast_high if temp_type == "HIGH" else forecast_low
     if forecast is None:
-        return None, city
+        return None, None, city
 
-    sd_table = FORECAST_ERROR_SD.get(city, _DEFAULT_SD)
-    sd = sd_table.get(season, 3.0)
+    sd = _SD_BY_CITY_SEASON.get((city, season)) or _DEFAULT_SD.get(season, 3.0)
+    inv_sd = 1.0 / sd
 
     if bet_type == "B":
         low_bound = int(value)
         high_bound = low_bound + 1
-        prob = norm.cdf(high_bound + 0.5, forecast, sd) - norm.cdf(low_bound - 0.5, forecast, sd)
-    else:
-        threshold = int(value)
-        if "below" in yes_sub_title.lower():
-            prob = norm.cdf(threshold - 0.5, forecast, sd)
-        else:
-            prob = 1.0 - norm.cdf(threshold + 0.5, forecast, sd)
-
-    return max(0.0, min(1.0, prob)), city
+        return (high_bound + 0.5 - forecast) * inv_sd, (low_bound - 0.5 - forecast) * inv_sd, city
+    threshold = int(value)
+    if "below" in yes_sub_title.lower():
+        return (threshold - 0.5 - forecast) * inv_sd, -math.inf, city
+    return math.inf, (threshold + 0.5 - forecast) * inv_sd, city
 
 
 def _contract_prob_ensemble(ticker, ensemble_data, yes_sub_title=""):
@@ -121,13 +148,10 @@ def _contract_prob_ensemble(ticker, ensemble_data, yes_sub_title=""):
     Uses the actual spread of 100+ weather model runs instead of a hardcoded
     standard deviation. Falls back to None if ensemble data is insufficient.
     """
-    m = CONTRACT_RE.search(ticker)
-    if not m:
+    parsed = _parse_ticker(ticker)
+    if not parsed:
         return None, None
-    temp_type = m.group(1)
-    city = m.group(2)
-    bet_type = m.group(3)
-    value = float(m.group(4))
+    temp_type, city, bet_type, value = parsed
 
     if temp_type == "HIGH":
         members = ensemble_data.get("high_members", [])
@@ -161,35 +185,58 @@ def _contract_prob_ensemble(ticker, ensemble_data, yes_sub_title=""):
 # Data fetching (same as agent.py)
 # ---------------------------------------------------------------------------
 
+# Keep-alive session for the Worker, so batches and retries reuse pooled TLS connections.
+# Connection failures retry immediately; 502/503/504 retry with exponential back-off;
+# other HTTP errors aren't retried. A read timeout is retried once.
+_worker_session = requests.Session()
+_worker_session.mount("https://", HTTPAdapter(
+    pool_connections=4, pool_maxsize=8,
+    max_retries=Retry(total=3, read=1, backoff_factor=0.3,
+                      status_forcelist=(502, 503, 504), allowed_methods=("GET",)),
+))
+_worker_session.headers["Accept-Encoding"] = ACCEPT_ENCODING
+atexit.register(_worker_session.close)
+
+
 def _fetch_worker(target_date, city_codes):
     params = {"date": target_date, "cities": ",".join(city_codes)}
-    url = f"{WORKER_URL}/bundle"
-    for attempt in range(2):
-        try:
-            r = requests.get(url, params=params, timeout=45)
-            r.raise_for_status()
-            return r.json()
-        except Exception as e:
-            if attempt == 0:
-                print(f"  Worker fetch failed ({e}), retrying...")
-                time.sleep(2)
-            else:
-                raise
+    r = _worker_session.get(f"{WORKER_URL}/bundle", params=params, timeout=(3.05, 45))
+    r.raise_for_status()
+    return r.json()
 
 
 def fetch_bundle(target_date, cities):
     BATCH_SIZE = 3
+    batches = [cities[i:i + BATCH_SIZE] for i in range(0, len(cities), BATCH_SIZE)]
+    for n, batch in enumerate(batches, 1):
+        print(f"  [FETCH] Batch {n}: {', '.join(batch)}")
+    # Each batch is its own Worker invocation (own subrequest budget), so they can run at once
+    with ThreadPoolExecutor(max_workers=min(4, len(batches)) or 1) as pool:
+        results = list(pool.map(lambda batch: _fetch_worker(target_date, batch), batches))
     merged = {"generated_at": None, "target_date": target_date, "cities": {}, "errors": []}
-    for i in range(0, len(cities), BATCH_SIZE):
-        batch = cities[i:i + BATCH_SIZE]
-        print(f"  [FETCH] Batch {i // BATCH_SIZE + 1}: {', '.join(batch)}")
-        result = _fetch_worker(target_date, batch)
+    for result in results:
         merged["generated_at"] = result.get("generated_at")
         merged["cities"].update(result.get("cities", {}))
         merged["errors"].extend(result.get("errors", []))
+    _normalize_orderbooks(merged)
     return merged
 
 
+def _normalize_orderbooks(bundle):
+    """Rewrite every orderbook side as [[price, qty], ...] (bare prices get qty None),
+    so find_bets can read book[-1][0] without checking the level's shape."""
+    for city in bundle.get("cities", {}).values():
+        for mdata in city.get("markets", {}).values():
+            for c in mdata.get("contracts", []):
+                ob = c.get("orderbook")
+                if not ob:
+                    continue
+                for side in ("yes", "no"):
+                    levels = ob.get(side)
+                    if levels and not all(isinstance(lv, list) for lv in levels):
+                        ob[side] = [lv if isinstance(lv, list) else [lv, None] for lv in levels]
+
+
 # ---------------------------------------------------------------------------
 # Bet selection engine
 # ---------------------------------------------------------------------------
@@ -217,8 +264,11 @@ def find_bets(bundle, target_date, market_type="all"):
     # --- Guardrail: City limits ---
     city_counts = get_city_bet_count(target_date)
 
-    bets = []
-
+    # Pass 1: per-city context, crossing prices and a probability for each
+    # priced contract. Ensemble probabilities are counted here; SD-model ones
+    # are batched for one ndtr call.
+    scanned = []  # (code, existing_city_bets, city_ctx, [[contract, prob, prob_source, cost_yes, cost_no], ...])
+    sd_rows, z_bounds = [], []
     for code, city in bundle.get("cities", {}).items():
         # Check city limit before scanning
         existing_city_bets = city_counts.get(code, 0)
@@ -255,9 +305,17 @@ def find_bets(bundle, target_date, market_type="all"):
             ens_err = ensemble.get("error", "no data")
             print(f"  [ENSEMBLE] {code}: unavailable ({ens_err}), using SD model")
 
-        current_temp = w.get("current_temp_f")
-        city_new_bets = 0
-        city_bets_buffer = []
+        city_ctx = {
+            "forecast_high_f": forecast_high,
+            "forecast_low_f": forecast_low,
+            "ensemble_member_count": ens_stats.get("count"),
+            "ensemble_mean_high": ens_stats.get("mean_high"),
+            "ensemble_mean_low": ens_stats.get("mean_low"),
+            "ensemble_sd_high": ens_stats.get("sd_high"),
+            "ensemble_sd_low": ens_stats.get("sd_low"),
+            "current_temp_f": w.get("current_temp_f"),
+        }
+        rows = []
 
         market_types = ("high", "low") if market_type == "all" else (market_type,)
         for mtype in market_types:
@@ -271,6 +329,16 @@ def find_bets(bundle, target_date, market_type="all"):
                     print(f"  [DEDUP] Skipping {ticker} -- already have a position")
                     continue
 
+                # YES crosses the NO side, NO crosses the YES side (best bid = last
+                # entry; levels are [price, qty] after fetch_bundle)
+                ob = c.get("orderbook") or {}
+                yes_bids = ob.get("yes") or []
+                no_bids = ob.get("no") or []
+                if not yes_bids and not no_bids:
+                    continue  # Nothing to cross, so no point pricing it
+                cost_yes = 100 - no_bids[-1][0] if no_bids else None
+                cost_no = 100 - yes_bids[-1][0] if yes_bids else None
+
                 # Try ensemble-based probability first, fall back to hardcoded SD
                 prob = None
                 prob_source = "sd_model"
@@ -278,86 +346,82 @@ def find_bets(bundle, target_date, market_type="all"):
                     prob, _ = _contract_prob_ensemble(ticker, ensemble, yes_sub)
                     if prob is not None:
                         prob_source = "ensemble"
+                row = [c, prob, prob_source, cost_yes, cost_no]
                 if prob is None:
-                    prob, _ = _contract_prob(ticker, forecast_high, forecast_low, season, yes_sub)
-                if prob is None:
-                    continue
-
-                ob = c.get("orderbook") or {}
-                yes_bids = ob.get("yes") or []
-                no_bids = ob.get("no") or []
-
-                # Evaluate YES side
-                if no_bids:
-                    best_no_bid = no_bids[-1][0] if isinstance(no_bids[-1], list) else no_bids[-1]
-                    cost_yes = 100 - best_no_bid
-                    ev_yes = prob * (100 - cost_yes) - (1 - prob) * cost_yes
-                else:
-                    cost_yes = None
-                    ev_yes = None
-
-                # Evaluate NO side
-                if yes_bids:
-                    best_yes_bid = yes_bids[-1][0] if isinstance(yes_bids[-1], list) else yes_bids[-1]
-                    cost_no = 100 - best_yes_bid
-                    ev_no = (1 - prob) * (100 - cost_no) - prob * cost_no
-                else:
-                    cost_no = None
-                    ev_no = None
-
-                # --- Guardrail: Block negative-EV bets ---
-                candidates = []
-                if ev_yes is not None and ev_yes >= MIN_EV_CENTS and MIN_PRICE_CENTS <= cost_yes <= MAX_PRICE_CENTS:
-                    candidates.append(("yes", cost_yes, ev_yes))
-                if ev_no is not None and ev_no >= MIN_EV_CENTS and MIN_PRICE_CENTS <= cost_no <= MAX_PRICE_CENTS:
-                    candidates.append(("no", cost_no, ev_no))
-
-                if not candidates:
-                    continue
-
-                # Pick the side with higher EV
-                best = max(candidates, key=lambda x: x[2])
-                side, cost, ev = best
+                    z_upper, z_lower, _ = _contract_z_bounds(ticker, forecast_high, forecast_low, season, yes_sub)
+                    if z_upper is None:
+                        continue
+                    z_bounds.append((z_upper, z_lower))
+                    sd_rows.append(row)
+                rows.append(row)
+        scanned.append((code, existing_city_bets, city_ctx, rows))
+
+    # One ndtr call for every SD-model contract in the bundle
+    cdf = ndtr(np.array(z_bounds, dtype=float).reshape(-1, 2))
+    for row, prob in zip(sd_rows, np.clip(cdf[:, 0] - cdf[:, 1], 0.0, 1.0).tolist()):
+        row[1] = prob
+
+    # Pass 2: EV and side selection for the whole bundle as array ops
+    flat = [(code, city_ctx, *row) for code, _, city_ctx, rows in scanned for row in rows]
+    costs_yes = [f[5] for f in flat]
+    costs_no = [f[6] for f in flat]
+
+    # Missing books are NaN, which fails every comparison below
+    cy = np.array([np.nan if x is None else x for x in costs_yes], dtype=float)
+    cn = np.array([np.nan if x is None else x for x in costs_no], dtype=float)
+    ev_yes, ev_no = contract_ev([f[3] for f in flat], cy, cn)
+
+    # --- Guardrail: Block negative-EV bets (and prices place_order would reject) ---
+    ok_yes = (ev_yes >= MIN_EV_CENTS) & (cy >= MIN_PRICE_CENTS) & (cy <= MAX_PRICE_CENTS)
+    ok_no = (ev_no >= MIN_EV_CENTS) & (cn >= MIN_PRICE_CENTS) & (cn <= MAX_PRICE_CENTS)
+    # Pick the side with higher EV (YES on a tie)
+    pick_yes = ok_yes & ~(ok_no & (ev_no > ev_yes))
+    pick_yes, ev_yes, ev_no = pick_yes.tolist(), ev_yes.tolist(), ev_no.tolist()
+
+    city_buffers = {code: [] for code, _, _, _ in scanned}
+    for i in np.flatnonzero(ok_yes | ok_no).tolist():
+        code, city_ctx, c, prob, prob_source, _, _ = flat[i]
+        ticker = c["ticker"]
+        if pick_yes[i]:
+            side, cost, ev = "yes", costs_yes[i], ev_yes[i]
+        else:
+            side, cost, ev = "no", costs_no[i], ev_no[i]
 
-                # --- Guardrail: Contradictory bet blocking ---
-                # Don't bet opposite side of a ticker we already hold
-                opposite = "no" if side == "yes" else "yes"
-                if (ticker, opposite) in existing_positions:
-                    print(f"  [CONFLICT] Skipping {side.upper()} on {ticker} -- already hold {opposite.upper()}")
-                    continue
+        # --- Guardrail: Contradictory bet blocking ---
+        # Don't bet opposite side of a ticker we already hold
+        opposite = "no" if side == "yes" else "yes"
+        if (ticker, opposite) in existing_positions:
+            print(f"  [CONFLICT] Skipping {side.upper()} on {ticker} -- already hold {opposite.upper()}")
+            continue
 
-                # Determine yes_price_cents for the order
-                if side == "yes":
-                    yes_price_cents = cost
-                else:
-                    yes_price_cents = 100 - cost
-
-                # Determine contract count (max 5, respect MAX_BET_DOLLARS)
-                contracts = min(MAX_CONTRACTS_PER_ORDER, int(MAX_BET_DOLLARS * 100 / cost))
-                if contracts < 1:
-                    contracts = 1
-
-                city_bets_buffer.append({
-                    "ticker": ticker,
-                    "side": side,
-                    "yes_price_cents": yes_price_cents,
-                    "contracts": contracts,
-                    "cost_cents": cost * contracts,
-                    "ev_cents": round(ev, 1),
-                    "model_prob": round(prob, 3),
-                    "prob_source": prob_source,
-                    "city": code,
-                    "title": yes_sub,
-                    "forecast_high_f": forecast_high,
-                    "forecast_low_f": forecast_low,
-                    "ensemble_member_count": ens_stats.get("count"),
-                    "ensemble_mean_high": ens_stats.get("mean_high"),
-                    "ensemble_mean_low": ens_stats.get("mean_low"),
-                    "ensemble_sd_high": ens_stats.get("sd_high"),
-                    "ensemble_sd_low": ens_stats.get("sd_low"),
-                    "current_temp_f": current_temp,
-                })
+        # Determine yes_price_cents for the order
+        if side == "yes":
+            yes_price_cents = cost
+        else:
+            yes_price_cents = 100 - cost
+
+        # Determine contract count (max 5, respect MAX_BET_DOLLARS)
+        contracts = min(MAX_CONTRACTS_PER_ORDER, MAX_BET_CENTS // cost)
+        if contracts < 1:
+            contracts = 1
+
+        city_buffers[code].append({
+            "ticker": ticker,
+            "side": side,
+            "yes_price_cents": yes_price_cents,
+            "contracts": contracts,
+            "cost_cents": cost * contracts,
+            "ev_cents": round(ev, 1),
+            "model_prob": round(prob, 3),
+            "prob_source": prob_source,
+            "city": code,
+            "title": c.get("yes_sub_title", ""),
+            **city_ctx,
+        })
 
+    bets = []
+    for code, existing_city_bets, _, _ in scanned:
+        city_bets_buffer = city_buffers[code]
         # --- Guardrail: City limit (for new bets this run) ---
         city_bets_buffer.sort(key=lambda b: b["ev_cents"], reverse=True)
         slots_left = MAX_BETS_PER_CITY - existing_city_bets
@@ -379,80 +443,110 @@ def find_bets(bundle, target_date, market_type="all"):
 def execute_bets(bets, pk, api_key_id, base_url, dry_run, mode, target_date):
     """Execute the selected bets, respecting the per-run spending cap.
 
+    Orders go out concurrently in waves, with the same picks and sizes as
+    placing them one at a time in EV order. Each wave reserves budget for
+    its bets as if every order ahead of them fills. A bet that doesn't fit
+    in full under that reservation ends the wave, so it is only resized or
+    skipped once the earlier results are back.
     Returns list of result dicts for notification.
     """
     run_spend_cents = 0
     results = []
+    trade_rows = []
+    i = 0
+    # One pool for every wave, so each worker keeps its own Kalshi session
+    # (tools/kalshi_auth.py) warm from one wave to the next
+    pool = ThreadPoolExecutor(max_workers=ORDER_WORKERS)
+    try:
+        while i < len(bets):
+            budget = MAX_RUN_CENTS - run_spend_cents
+            wave = []
+            while i < len(bets):
+                bet = bets[i]
+                cost_this = bet["cost_cents"]
+                if cost_this > budget:
+                    if wave:
+                        break  # Sizing depends on orders still in flight
+                    # Try to reduce contracts to fit
+                    cost_per = cost_this // bet["contracts"]
+                    can_afford = budget // cost_per if cost_per > 0 else 0
+                    if can_afford < 1:
+                        print(f"  SKIP (cap): {bet['ticker']} -- need {cost_this}c, only {budget}c left")
+                        i += 1
+                        continue
+                    bet["contracts"] = can_afford
+                    bet["cost_cents"] = cost_per * can_afford
+                budget -= bet["cost_cents"]
+                wave.append(bet)
+                i += 1
+            if not wave:
+                break
+
+            # tool_place_order never spends more than the cost it was given, so
+            # the reservation keeps the run under the cap however the orders land
+            placed = list(pool.map(
+                lambda bet: tool_place_order(pk, api_key_id, base_url, dry_run, bet["ticker"],
+                                             bet["side"], bet["yes_price_cents"], bet["contracts"]),
+                wave,
+            ))
+
+            for bet, result in zip(wave, placed):
+                cost_this = bet["cost_cents"]
+                print(f"\n  [{bet['city']}] {bet['ticker']}")
+                print(f"    Side: {bet['side'].upper()} | Cost: {cost_this}c ({bet['contracts']}x) | "
+                      f"EV: +{bet['ev_cents']:.0f}c | P={bet['model_prob']:.2f}")
+
+                if "error" in result:
+                    print(f"    REJECTED: {result['error']}")
+                    continue
 
-    for bet in bets:
-        cost_this = bet["cost_cents"]
-        if (run_spend_cents + cost_this) > int(MAX_RUN_DOLLARS * 100):
-            remaining = int(MAX_RUN_DOLLARS * 100) - run_spend_cents
-            # Try to reduce contracts to fit
-            cost_per = cost_this // bet["contracts"]
-            can_afford = remaining // cost_per if cost_per > 0 else 0
-            if can_afford < 1:
-                print(f"  SKIP (cap): {bet['ticker']} -- need {cost_this}c, only {remaining}c left")
-                continue
-            bet["contracts"] = can_afford
-            bet["cost_cents"] = cost_per * can_afford
-            cost_this = bet["cost_cents"]
-
-        print(f"\n  [{bet['city']}] {bet['ticker']}")
-        print(f"    Side: {bet['side'].upper()} | Cost: {cost_this}c ({bet['contracts']}x) | "
-              f"EV: +{bet['ev_cents']:.0f}c | P={bet['model_prob']:.2f}")
-
-        result_json = tool_place_order(
-            pk, api_key_id, base_url, dry_run,
-            bet["ticker"], bet["side"], bet["yes_price_cents"], bet["contracts"]
-        )
-        result = json.loads(result_json)
-
-        if "error" in result:
-            print(f"    REJECTED: {result['error']}")
-            continue
-
-        # Track spending
-        if "would_place" in result:
-            actual_cost = int(result["cost_dollars"] * 100)
-        elif "response" in result:
-            actual_cost = int(result["response"].get("_cost_dollars", 0) * 100)
-        else:
-            actual_cost = cost_this
-        run_spend_cents += actual_cost
-
-        # Determine fill status
-        filled = False
-        order_id = None
-        if not dry_run and "response" in result:
-            resp = result["response"]
-            order_data = resp.get("order", resp)
-            filled = order_data.get("fill_count", 0) > 0
-            order_id = order_data.get("order_id", order_data.get("client_order_id"))
-
-        status = "FILLED" if filled else ("DRY" if dry_run else "RESTING")
-        print(f"    -> {status} | Spend: ${run_spend_cents/100:.2f} / ${MAX_RUN_DOLLARS:.2f}")
-
-        # Log the trade
-        log_trade(
-            mode=mode, target_date=target_date, city=bet["city"],
-            ticker=bet["ticker"], title=bet["title"], side=bet["side"],
-            yes_price_cents=bet["yes_price_cents"], contracts=bet["contracts"],
-            forecast_high_f=bet.get("forecast_high_f"),
-            forecast_low_f=bet.get("forecast_low_f"),
-            est_probability=bet["model_prob"],
-            expected_value_cents=bet["ev_cents"],
-            filled=filled, order_id=order_id, dry_run=dry_run,
-            prob_source=bet.get("prob_source"),
-            ensemble_member_count=bet.get("ensemble_member_count"),
-            ensemble_mean_high=bet.get("ensemble_mean_high"),
-            ensemble_mean_low=bet.get("ensemble_mean_low"),
-            ensemble_sd_high=bet.get("ensemble_sd_high"),
-            ensemble_sd_low=bet.get("ensemble_sd_low"),
-            current_temp_f=bet.get("current_temp_f"),
-        )
-
-        results.append(bet)
+                # Track spending
+                if "would_place" in result:
+                    actual_cost = result["cost_cents"]
+                elif "response" in result:
+                    actual_cost = result["response"].get("_cost_cents", 0)
+                else:
+                    actual_cost = cost_this
+                run_spend_cents += actual_cost
+
+                # Determine fill status
+                filled = False
+                order_id = None
+                if not dry_run and "response" in result:
+                    resp = result["response"]
+                    order_data = resp.get("order", resp)
+                    filled = order_data.get("fill_count", 0) > 0
+                    order_id = order_data.get("order_id", order_data.get("client_order_id"))
+
+                status = "FILLED" if filled else ("DRY" if dry_run else "RESTING")
+                print(f"    -> {status} | Spend: ${run_spend_cents/100:.2f} / ${MAX_RUN_DOLLARS:.2f}")
+
+                # Log the trade (written in one batch below)
+                trade_rows.append(dict(
+                    mode=mode, target_date=target_date, city=bet["city"],
+                    ticker=bet["ticker"], title=bet["title"], side=bet["side"],
+                    yes_price_cents=bet["yes_price_cents"], contracts=bet["contracts"],
+                    forecast_high_f=bet.get("forecast_high_f"),
+                    forecast_low_f=bet.get("forecast_low_f"),
+                    est_probability=bet["model_prob"],
+                    expected_value_cents=bet["ev_cents"],
+                    filled=filled, order_id=order_id, dry_run=dry_run,
+                    prob_source=bet.get("prob_source"),
+                    ensemble_member_count=bet.get("ensemble_member_count"),
+                    ensemble_mean_high=bet.get("ensemble_mean_high"),
+                    ensemble_mean_low=bet.get("ensemble_mean_low"),
+                    ensemble_sd_high=bet.get("ensemble_sd_high"),
+                    ensemble_sd_low=bet.get("ensemble_sd_low"),
+                    current_temp_f=bet.get("current_temp_f"),
+                ))
+
+                results.append(bet)
+    finally:
+        pool.shutdown()
+        # One transaction for the whole run, written even if a wave fails
+        # part way so every order that went out is on record
+        if trade_rows:
+            log_trades(trade_rows)
 
     return results
 
@@ -507,10 +601,10 @@ def main():
         target_date = tomorrow.isoformat()
 
     # Cities
-    cities = args.cities if args.cities else list(CITY_CONFIGS.keys())
-    valid_cities = [c for c in cities if c in CITY_CONFIGS]
+    cities = args.cities if args.cities else CITY_CODES_TUPLE
+    valid_cities = [c for c in cities if c in CITY_CODES]
     if not valid_cities:
-        print(f"Error: No valid city codes. Available: {list(CITY_CONFIGS.keys())}")
+        print(f"Error: No valid city codes. Available: {list(CITY_CODES_TUPLE)}")
         sys.exit(1)
 
     season = _get_season(target_date)
@@ -597,8 +691,7 @@ def main():
 
     # Step 3: Check balance (if not dry run)
     if not dry_run:
-        bal_json = tool_get_account_balance(pk, kalshi_key_id, base_url)
-        bal = json.loads(bal_json)
+        bal = tool_get_account_balance(pk, kalshi_key_id, base_url)
         if "error" not in bal:
             print(f"\n[BALANCE] ${bal['balance_dollars']:.2f}")
         else:
@@ -606,25 +699,24 @@ def main():
 
     # Step 4: Execute bets
     print(f"\n[EXECUTE] Placing {len(bets)} bet(s)...")
-    run_start = datetime.datetime.now(CST).isoformat()
+    run_start = now.isoformat()
     results = execute_bets(bets, pk, kalshi_key_id, base_url, dry_run, mode, target_date)
 
     # Step 5: Log the run
     total_cost = sum(r["cost_cents"] for r in results)
     log_run(mode, target_date, valid_cities, len(results), len(bets) - len(results), total_cost)
 
-    # Step 6: Notify Discord
+    # Step 6: Notify Discord -- bets and bet logic in one webhook POST, sent in
+    # the background while the summary and export run
+    notify_futures = []
     if results and not dry_run:
         try:
-            recent = get_trade_history(limit=50)
-            run_trades = [t for t in recent
-                          if t["timestamp"] >= run_start
-                          and t["filled"]
-                          and not t["dry_run"]]
+            run_trades = get_trade_history(limit=None, since=run_start, filled_only=True,
+                                           include_dry_run=False)
             if run_trades:
-                notify_bets_placed(run_trades, mode, target_date,
-                                   token_stats={"input_tokens": 0, "output_tokens": 0, "cost_estimate": 0.0})
-                notify_bet_logic(run_trades, target_date)
+                notify_futures.append(_NOTIFY_POOL.submit(
+                    notify_bets_with_logic, run_trades, mode, target_date,
+                    token_stats={"input_tokens": 0, "output_tokens": 0, "cost_estimate": 0.0}))
         except Exception as e:
             print(f"[NOTIFY] Failed: {e}")
 
@@ -638,6 +730,12 @@ def main():
     # Step 7: Export dashboard data
     _export_dashboard_json()
 
+    for fut in notify_futures:
+        try:
+            fut.result(timeout=NOTIFY_TIMEOUT_SECS)
+        except Exception as e:
+            print(f"[NOTIFY] Failed: {e}")
+
 
 def _export_dashboard_json():
     """Export all trade/run data to dashboard/data.json for the live dashboard."""
@@ -77,6 +77,10 @@ CITY_CONFIGS = {
     },
 }
 
+# Precomputed views of the city table (order preserved in the tuple)
+CITY_CODES = frozenset(CITY_CONFIGS)
+CITY_CODES_TUPLE = tuple(CITY_CONFIGS)
+
 # Kalshi API base URLs
 KALSHI_PROD_BASE = "https://api.elections.kalshi.com"
 KALSHI_DEMO_BASE = "https://demo-api.kalshi.co"
@@ -30,6 +30,10 @@ from tools.notify import notify_settlements, notify_error
 
 CST = ZoneInfo("America/Chicago")
 
+# One keep-alive session for the per-city NWS observation requests
+_nws_session = requests.Session()
+_nws_session.headers.update(NWS_HEADERS)
+
 # Ticker format: KX(HIGH|LOWT)(CITY)-YYMMM DD-([BT])(VALUE)
 # Examples:
 #   KXHIGHCHI-26FEB12-B38.5  -> Chicago high, between 38-39F
@@ -80,7 +84,7 @@ def fetch_observed_temps(city_code, target_date):
     # Retry up to 3 times
     for attempt in range(3):
         try:
-            r = requests.get(url, params=params, headers=NWS_HEADERS, timeout=20)
+            r = _nws_session.get(url, params=params, timeout=20)
             r.raise_for_status()
             break
         except Exception as e:
@@ -0,0 +1,27 @@
+"""
+Expected-value math for Kalshi contracts, vectorized over a batch.
+
+Buying a contract at `cost` cents pays 100c if it wins, so with win
+probability q the EV is q * (100 - cost) - (1 - q) * cost. YES wins with
+P(YES); NO wins with 1 - P(YES).
+"""
+
+import numpy as np
+
+
+def contract_ev(prob, cost_yes, cost_no):
+    """EV in cents of buying YES and of buying NO, for every contract at once.
+
+    Args:
+        prob: P(YES wins) per contract
+        cost_yes: cost to buy YES in cents (NaN where the NO book is empty)
+        cost_no: cost to buy NO in cents (NaN where the YES book is empty)
+
+    Returns (ev_yes, ev_no) float arrays, NaN wherever the cost is NaN.
+    """
+    p = np.asarray(prob, dtype=float)
+    cy = np.asarray(cost_yes, dtype=float)
+    cn = np.asarray(cost_no, dtype=float)
+    ev_yes = p * (100 - cy) - (1 - p) * cy
+    ev_no = (1 - p) * (100 - cn) - p * cn
+    return ev_yes, ev_no
@@ -1,10 +1,24 @@
 import datetime
 import base64
+import threading
 import requests
 from cryptography.hazmat.primitives import serialization, hashes
 from cryptography.hazmat.backends import default_backend
 from cryptography.hazmat.primitives.asymmetric import padding
 
+# One keep-alive session per thread, so TLS handshakes are paid once per thread
+# rather than per call. requests.Session isn't guaranteed thread-safe, and
+# balance prefetch and auto_trade's order placement run Kalshi calls on pool
+# threads.
+_local = threading.local()
+
+
+def _session():
+    session = getattr(_local, "session", None)
+    if session is None:
+        session = _local.session = requests.Session()
+    return session
+
 
 def load_private_key(path):
     """Load an RSA private key from a PEM file."""
@@ -41,10 +55,10 @@ def kalshi_get(pk, api_key_id, base_url, path, params=None):
     if params:
         full_path += "?" + "&".join(f"{k}={v}" for k, v in params.items())
     headers = make_auth_headers(pk, api_key_id, "GET", path)
-    return requests.get(base_url + full_path, headers=headers, timeout=15)
+    return _session().get(base_url + full_path, headers=headers, timeout=15)
 
 
 def kalshi_post(pk, api_key_id, base_url, path, body):
     """Authenticated POST request to Kalshi API."""
     headers = make_auth_headers(pk, api_key_id, "POST", path)
-    return requests.post(base_url + path, json=body, headers=headers, timeout=15)
+    return _session().post(base_url + path, json=body, headers=headers, timeout=15)
@@ -1,4 +1,3 @@
-import json
 import uuid
 from .kalshi_auth import kalshi_get, kalshi_post
 from config import MAX_BET_DOLLARS, MAX_CONTRACTS_PER_ORDER
@@ -6,33 +5,37 @@ from config import MAX_BET_DOLLARS, MAX_CONTRACTS_PER_ORDER
 # Price guardrails -- the agent cannot override these
 MIN_PRICE_CENTS = 15  # never buy YES below 15c (longshot garbage)
 MAX_PRICE_CENTS = 85  # never buy YES above 85c (paying 85c+ to win 15c = bad risk/reward)
+_MAX_BET_CENTS = int(round(MAX_BET_DOLLARS * 100))
 
 
 def tool_get_account_balance(pk, api_key_id, base_url):
-    """Get current Kalshi account balance."""
+    """Get current Kalshi account balance, as a dict (like tool_place_order)."""
     try:
         r = kalshi_get(pk, api_key_id, base_url, "/trade-api/v2/portfolio/balance")
         if r.status_code == 200:
             data = r.json()
-            return json.dumps({
+            return {
                 "balance_cents": data["balance"],
                 "balance_dollars": data["balance"] / 100,
                 "portfolio_value_cents": data.get("portfolio_value", 0),
                 "portfolio_value_dollars": data.get("portfolio_value", 0) / 100,
-            })
-        return json.dumps({"error": f"HTTP {r.status_code}", "body": r.text[:500]})
+            }
+        return {"error": f"HTTP {r.status_code}", "body": r.text[:500]}
     except Exception as e:
-        return json.dumps({"error": str(e)})
+        return {"error": str(e)}
 
 
 def tool_place_order(pk, api_key_id, base_url, dry_run, ticker, side, yes_price_cents, contracts):
-    """Place a Kalshi limit order with built-in risk enforcement."""
+    """Place a Kalshi limit order with built-in risk enforcement.
+
+    Returns a dict so callers can read the outcome without re-parsing JSON.
+    """
     # --- Risk enforcement (not overridable by the agent) ---
     contracts = min(contracts, MAX_CONTRACTS_PER_ORDER)
     if contracts < 1:
         contracts = 1
     if not (1 <= yes_price_cents <= 99):
-        return json.dumps({"error": f"Price {yes_price_cents}c out of range (must be 1-99)"})
+        return {"error": f"Price {yes_price_cents}c out of range (must be 1-99)"}
 
     # Calculate the ACTUAL cost to the buyer
     if side == "yes":
@@ -43,27 +46,28 @@ def tool_place_order(pk, api_key_id, base_url, dry_run, ticker, side, yes_price_
     # PRICE GUARDRAILS: reject bad risk/reward bets
     if cost_per_contract > MAX_PRICE_CENTS:
         profit_if_win = 100 - cost_per_contract
-        return json.dumps({
+        return {
             "error": f"REJECTED: Cost {cost_per_contract}c per contract is too high "
                      f"(max {MAX_PRICE_CENTS}c). You'd risk {cost_per_contract}c to win "
                      f"only {profit_if_win}c. Find a better-priced contract.",
             "suggestion": "Look for contracts priced 20-70c where the risk/reward ratio is reasonable."
-        })
+        }
     if cost_per_contract < MIN_PRICE_CENTS:
-        return json.dumps({
+        return {
             "error": f"REJECTED: Cost {cost_per_contract}c per contract is too low "
                      f"(min {MIN_PRICE_CENTS}c). Longshot bets under {MIN_PRICE_CENTS}c rarely hit. "
                      f"Find a contract closer to the forecast threshold.",
             "suggestion": "Look for contracts where the NWS forecast is near the threshold, priced 20-70c."
-        })
+        }
 
-    # Max dollar enforcement
-    cost_dollars = cost_per_contract * contracts / 100
-    if cost_dollars > MAX_BET_DOLLARS:
-        contracts = int(MAX_BET_DOLLARS * 100 / cost_per_contract)
+    # Max dollar enforcement (integer cents; dollars only for display)
+    cost_cents = cost_per_contract * contracts
+    if cost_cents > _MAX_BET_CENTS:
+        contracts = _MAX_BET_CENTS // cost_per_contract
         if contracts < 1:
-            return json.dumps({"error": f"Even 1 contract costs ${cost_per_contract/100:.2f} which exceeds ${MAX_BET_DOLLARS} limit"})
-        cost_dollars = cost_per_contract * contracts / 100
+            return {"error": f"Even 1 contract costs ${cost_per_contract/100:.2f} which exceeds ${MAX_BET_DOLLARS} limit"}
+        cost_cents = cost_per_contract * contracts
+    cost_dollars = cost_cents / 100
 
     profit_if_win = (100 - cost_per_contract) * contracts / 100
 
@@ -78,25 +82,25 @@ def tool_place_order(pk, api_key_id, base_url, dry_run, ticker, side, yes_price_
     }
 
     if dry_run:
-        return json.dumps(
-            {
-                "dry_run": True,
-                "would_place": order,
-                "cost_dollars": cost_dollars,
-                "profit_if_win_dollars": profit_if_win,
-                "risk_reward": f"risk ${cost_dollars:.2f} to win ${profit_if_win:.2f}",
-            }
-        )
+        return {
+            "dry_run": True,
+            "would_place": order,
+            "cost_dollars": cost_dollars,
+            "cost_cents": cost_cents,
+            "profit_if_win_dollars": profit_if_win,
+            "risk_reward": f"risk ${cost_dollars:.2f} to win ${profit_if_win:.2f}",
+        }
 
     try:
         r = kalshi_post(pk, api_key_id, base_url, "/trade-api/v2/portfolio/orders", order)
         resp = r.json()
         resp["_cost_dollars"] = cost_dollars
+        resp["_cost_cents"] = cost_cents
         resp["_profit_if_win"] = profit_if_win
         resp["_risk_reward"] = f"risk ${cost_dollars:.2f} to win ${profit_if_win:.2f}"
-        return json.dumps({"http_status": r.status_code, "response": resp})
+        return {"http_status": r.status_code, "response": resp}
     except Exception as e:
-        return json.dumps({"error": str(e)})
+        return {"error": str(e)}
 
 
 # Tool definitions for the Claude API
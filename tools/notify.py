@@ -6,6 +6,7 @@ Set DISCORD_WEBHOOK_URL in your .env file.
 """
 
 import os
+import re
 import datetime
 import requests
 from zoneinfo import ZoneInfo
@@ -14,6 +15,12 @@ CST = ZoneInfo("America/Chicago")
 
 WEBHOOK_URL = None  # Loaded lazily from env
 
+# Threshold digits after a B/T marker in a ticker (bet-logic breakdown)
+_THRESHOLD_RE = re.compile(r"[BT]([\d.]+)")
+
+# Reused across posts so a run's messages share one TLS connection
+_session = requests.Session()
+
 
 def _get_webhook_url():
     """Load webhook URL from environment (lazy, so .env can be loaded first)."""
@@ -23,14 +30,17 @@ def _get_webhook_url():
     return WEBHOOK_URL
 
 
-def send_discord(content):
-    """Send a plain text message to the Discord webhook."""
+def send_discord(content, embeds=None):
+    """Send a plain text message (plus optional embeds) to the Discord webhook."""
     url = _get_webhook_url()
     if not url:
         print("[NOTIFY] No DISCORD_WEBHOOK_URL set, skipping notification.")
         return False
+    payload = {"content": content}
+    if embeds:
+        payload["embeds"] = embeds
     try:
-        r = requests.post(url, json={"content": content}, timeout=10)
+        r = _session.post(url, json=payload, timeout=10)
         if r.status_code in (200, 204):
             return True
         print(f"[NOTIFY] Discord returned HTTP {r.status_code}: {r.text[:200]}")
@@ -51,7 +61,18 @@ def notify_bets_placed(trades, mode, target_date, token_stats=None):
     """
     if not trades:
         return
+    send_discord(_bets_placed_message(trades, mode, target_date, token_stats))
+
+
+def notify_bets_with_logic(trades, mode, target_date, token_stats=None):
+    """notify_bets_placed() and notify_bet_logic() combined into one webhook POST."""
+    if not trades:
+        return
+    send_discord(_bets_placed_message(trades, mode, target_date, token_stats),
+                 embeds=[_bet_logic_embed(trades, target_date)])
 
+
+def _bets_placed_message(trades, mode, target_date, token_stats):
     now = datetime.datetime.now(CST)
     total_cost = sum(t["cost_cents"] for t in trades) / 100
     count = len(trades)
@@ -77,8 +98,7 @@ def notify_bets_placed(trades, mode, target_date, token_stats=None):
         api_cost = token_stats.get("cost_estimate", 0)
         lines.append(f"API: {tok_in:,} in / {tok_out:,} out | ~${api_cost:.4f}")
     lines.append(f"Mode: {mode} | {now.strftime('%I:%M %p CT')}")
-
-    send_discord("\n".join(lines))
+    return "\n".join(lines)
 
 
 def notify_bet_logic(trades, target_date):
@@ -95,6 +115,16 @@ def notify_bet_logic(trades, target_date):
     if not url:
         return
 
+    embed = _bet_logic_embed(trades, target_date)
+    try:
+        r = _session.post(url, json={"embeds": [embed]}, timeout=10)
+        if r.status_code not in (200, 204):
+            print(f"[NOTIFY] Bet logic Discord returned HTTP {r.status_code}")
+    except Exception as e:
+        print(f"[NOTIFY] Bet logic webhook failed: {e}")
+
+
+def _bet_logic_embed(trades, target_date):
     fields = []
     for i, t in enumerate(trades, 1):
         city = t.get("city", "?")
@@ -126,8 +156,7 @@ def notify_bet_logic(trades, target_date):
         sd_str = f"{ens_sd:.1f}°F" if ens_sd else "?"
 
         # Extract threshold from ticker
-        import re
-        match = re.search(r'[BT]([\d.]+)', ticker)
+        match = _THRESHOLD_RE.search(ticker)
         threshold = match.group(1) if match else "?"
 
         # Determine what we're betting
@@ -188,13 +217,7 @@ def notify_bet_logic(trades, target_date):
             "text": "Cloudflare cron → GitHub Actions → Kalshi API"
         }
     }
-
-    try:
-        r = requests.post(url, json={"embeds": [embed]}, timeout=10)
-        if r.status_code not in (200, 204):
-            print(f"[NOTIFY] Bet logic Discord returned HTTP {r.status_code}")
-    except Exception as e:
-        print(f"[NOTIFY] Bet logic webhook failed: {e}")
+    return embed
 
 
 def notify_settlements(results, target_date):
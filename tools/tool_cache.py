@@ -0,0 +1,74 @@
+"""
+Disk-backed TTL cache for Worker bundles.
+
+agent.fetch_bundle stores the merged bundle here so a back-to-back dev run
+for the same date and cities can skip the Worker round trip. Errors are
+never cached.
+"""
+
+import os
+import json
+import time
+import sqlite3
+
+CACHE_PATH = os.environ.get(
+    "KALSHI_TOOL_CACHE_PATH",
+    os.path.join(os.path.dirname(os.path.dirname(__file__)), ".tool_cache.db"),
+)
+
+# Freshness window per entry name, in seconds. Names not listed here are
+# never cached.
+TOOL_CACHE_TTL = {
+    "worker_bundle": 30,  # agent.fetch_bundle, for back-to-back dev runs
+}
+
+
+def _get_db():
+    db = sqlite3.connect(CACHE_PATH)
+    db.execute("""
+        CREATE TABLE IF NOT EXISTS tool_cache (
+            key TEXT PRIMARY KEY,
+            value TEXT NOT NULL,
+            expires_at REAL NOT NULL
+        )
+    """)
+    return db
+
+
+def _key(name, args):
+    return f"{name}:{json.dumps(args, sort_keys=True, separators=(',', ':'))}"
+
+
+def cache_get(name, args):
+    """Return the cached JSON result for (name, args), or None if missing/expired."""
+    if name not in TOOL_CACHE_TTL:
+        return None
+    try:
+        db = _get_db()
+        row = db.execute(
+            "SELECT value FROM tool_cache WHERE key = ? AND expires_at > ?",
+            (_key(name, args), time.time()),
+        ).fetchone()
+        db.close()
+    except sqlite3.Error:
+        return None
+    return row[0] if row else None
+
+
+def cache_set(name, args, value):
+    """Store a successful JSON tool result under (name, args) for the tool's TTL."""
+    ttl = TOOL_CACHE_TTL.get(name)
+    if not ttl:
+        return
+    try:
+        db = _get_db()
+        now = time.time()
+        db.execute("DELETE FROM tool_cache WHERE expires_at <= ?", (now,))
+        db.execute(
+            "INSERT OR REPLACE INTO tool_cache (key, value, expires_at) VALUES (?, ?, ?)",
+            (_key(name, args), value, now + ttl),
+        )
+        db.commit()
+        db.close()
+    except sqlite3.Error:
+        pass
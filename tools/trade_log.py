@@ -1,7 +1,9 @@
 import os
 import json
+import queue
 import sqlite3
 import datetime
+import threading
 from zoneinfo import ZoneInfo
 
 DB_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), "trades.db")
@@ -54,6 +56,7 @@ def _get_db():
             db.execute(f"ALTER TABLE trades ADD COLUMN {col} {ctype}")
         except sqlite3.OperationalError:
             pass  # column already exists
+    db.execute("CREATE INDEX IF NOT EXISTS idx_trades_timestamp ON trades (timestamp)")
     db.execute("""
         CREATE TABLE IF NOT EXISTS runs (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -89,16 +92,15 @@ def log_run(mode, target_date, cities, trades_placed, trades_skipped,
     db.close()
 
 
-def log_trade(mode, target_date, city, ticker, title, side, yes_price_cents,
-              contracts, forecast_high_f=None, forecast_low_f=None,
-              est_probability=None, expected_value_cents=None,
-              filled=False, order_id=None, dry_run=False,
-              prob_source=None, ensemble_member_count=None,
-              ensemble_mean_high=None, ensemble_mean_low=None,
-              ensemble_sd_high=None, ensemble_sd_low=None,
-              current_temp_f=None):
-    """Log a single trade to the database."""
-    db = _get_db()
+def _insert_trade(db, mode, target_date, city, ticker, title, side, yes_price_cents,
+                  contracts, forecast_high_f=None, forecast_low_f=None,
+                  est_probability=None, expected_value_cents=None,
+                  filled=False, order_id=None, dry_run=False,
+                  prob_source=None, ensemble_member_count=None,
+                  ensemble_mean_high=None, ensemble_mean_low=None,
+                  ensemble_sd_high=None, ensemble_sd_low=None,
+                  current_temp_f=None):
+    """INSERT one trade row on an open connection (caller commits)."""
     now = datetime.datetime.now(CST).isoformat()
 
     if side == "yes":
@@ -126,19 +128,130 @@ def log_trade(mode, target_date, city, ticker, title, side, yes_price_cents,
          ensemble_mean_high, ensemble_mean_low,
          ensemble_sd_high, ensemble_sd_low, current_temp_f),
     )
+
+
+def log_trade(**trade):
+    """Log a single trade to the database.
+
+    Takes the same keyword arguments as _insert_trade().
+    """
+    db = _get_db()
+    _insert_trade(db, **trade)
     db.commit()
     db.close()
 
 
-def get_trade_history(limit=50, mode=None):
-    """Get recent trade history."""
+def log_trades(trades):
+    """Log several trades (dicts of log_trade() arguments) in one transaction."""
     db = _get_db()
-    query = "SELECT * FROM trades ORDER BY timestamp DESC"
+    with db:
+        for trade in trades:
+            _insert_trade(db, **trade)
+    db.close()
+
+
+# Background trade writer: log_trade_async() returns immediately and a daemon
+# thread does the INSERT on its own connection. Trades that queue up while a
+# write is in progress go out together in one transaction. Call
+# flush_trade_log() before reading trades back (guardrails, notifications) or
+# exiting.
+_log_queue = queue.Queue()
+_log_thread = None
+_log_thread_lock = threading.Lock()
+_LOG_BATCH_MAX = 16
+
+
+def _write_batch(db, batch):
+    try:
+        with db:
+            for trade in batch:
+                _insert_trade(db, **trade)
+        return
+    except Exception:
+        pass
+    # Something in the batch failed and was rolled back; retry row by row so
+    # one bad trade doesn't take the others with it
+    for trade in batch:
+        try:
+            with db:
+                _insert_trade(db, **trade)
+        except Exception as e:
+            print(f"[LOG] Failed to write trade {trade.get('ticker')}: {e}")
+
+
+def _drain_trade_log():
+    db = None
+    while True:
+        batch = [_log_queue.get()]
+        while len(batch) < _LOG_BATCH_MAX:
+            try:
+                batch.append(_log_queue.get_nowait())
+            except queue.Empty:
+                break
+        try:
+            # (Re)open lazily so a locked or unwritable DB costs this batch,
+            # not the writer thread -- flush_trade_log() would hang without it
+            if db is None:
+                db = _get_db()
+            _write_batch(db, batch)
+        except Exception as e:
+            print(f"[LOG] Failed to write {len(batch)} trade(s): {e}")
+            if db is not None:
+                try:
+                    db.close()
+                except Exception:
+                    pass
+                db = None
+        finally:
+            for _ in batch:
+                _log_queue.task_done()
+
+
+def log_trade_async(**trade):
+    """Queue a trade for the background writer (same arguments as log_trade)."""
+    global _log_thread
+    with _log_thread_lock:
+        if _log_thread is None:
+            _log_thread = threading.Thread(target=_drain_trade_log, daemon=True)
+            _log_thread.start()
+    _log_queue.put(trade)
+
+
+def flush_trade_log():
+    """Block until every queued trade has been written."""
+    _log_queue.join()
+
+
+def get_trade_history(limit=50, mode=None, since=None, filled_only=False, include_dry_run=True):
+    """Get recent trade history, newest first.
+
+    Args:
+        limit: max rows to return (None for no limit)
+        mode: only trades from this mode ("LIVE", "DEMO", "DRY RUN")
+        since: only trades with timestamp >= this ISO timestamp
+        filled_only: only trades that filled
+        include_dry_run: False to exclude simulated trades
+    """
+    db = _get_db()
+    where = []
     params = []
     if mode:
-        query = "SELECT * FROM trades WHERE mode = ? ORDER BY timestamp DESC"
-        params = [mode]
-    query += f" LIMIT {limit}"
+        where.append("mode = ?")
+        params.append(mode)
+    if since:
+        where.append("timestamp >= ?")
+        params.append(since)
+    if filled_only:
+        where.append("filled = 1")
+    if not include_dry_run:
+        where.append("dry_run = 0")
+    query = "SELECT * FROM trades"
+    if where:
+        query += " WHERE " + " AND ".join(where)
+    query += " ORDER BY timestamp DESC"
+    if limit is not None:
+        query += " LIMIT ?"
+        params.append(limit)
     rows = db.execute(query, params).fetchall()
     db.close()
     return [dict(r) for r in rows]
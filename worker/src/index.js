@@ -125,7 +125,31 @@ async function kalshiFetch(env, path) {
 // Data fetchers
 // ---------------------------------------------------------------------------
 
+async function fetchLatestObs(config) {
+  try {
+    const obsData = await safeFetch(
+      `https://api.weather.gov/stations/${config.station}/observations/latest`,
+      NWS_HEADERS
+    );
+    const props = obsData.properties;
+    let currentTemp = null;
+    if (props.temperature && props.temperature.value !== null) {
+      currentTemp = Math.round(cToF(props.temperature.value) * 10) / 10;
+    }
+    return {
+      currentTemp,
+      currentDesc: props.textDescription || null,
+      observedAt: props.timestamp || null,
+    };
+  } catch (_) {
+    return { currentTemp: null, currentDesc: null, observedAt: null };
+  }
+}
+
 async function fetchWeather(config, targetDate) {
+  // The station observation doesn't depend on the forecast, so start it
+  // alongside the points -> forecast chain instead of after it.
+  const obsPromise = fetchLatestObs(config);
   try {
     const pointsData = await safeFetch(
       `https://api.weather.gov/points/${config.lat},${config.lon}`,
@@ -153,19 +177,7 @@ async function fetchWeather(config, targetDate) {
       desc: p.shortForecast,
     }));
 
-    let currentTemp = null, currentDesc = null, observedAt = null;
-    try {
-      const obsData = await safeFetch(
-        `https://api.weather.gov/stations/${config.station}/observations/latest`,
-        NWS_HEADERS
-      );
-      const props = obsData.properties;
-      if (props.temperature && props.temperature.value !== null) {
-        currentTemp = Math.round(cToF(props.temperature.value) * 10) / 10;
-      }
-      currentDesc = props.textDescription || null;
-      observedAt = props.timestamp || null;
-    } catch (_) { /* ok */ }
+    const { currentTemp, currentDesc, observedAt } = await obsPromise;
 
     return {
       predicted_high_f: highF, predicted_low_f: lowF,